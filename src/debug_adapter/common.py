@@ -15,3 +15,6 @@ CommandResult = namedtuple("CommandResult", ["success", "message"])
 VAR_REF_LOCAL_BASE = 100000  # Local variables
 VAR_REF_REGISTERS_BASE = 200000  # Registers
 VAR_REF_DYNAMIC_BASE = 300000  # Dynamic objects (std::vector, struct, arrays)
+
+# Logging level below DEBUG for full DAP message dumps
+LOG_LEVEL_TRACE = 5
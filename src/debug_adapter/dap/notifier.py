@@ -8,15 +8,19 @@ and "invalidated", to notify the client about changes in the debugger's state.
 
 from __future__ import annotations
 
-from contextlib import contextmanager
+import logging
+from contextlib import contextmanager, nullcontext
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
     from debug_adapter.dap.server import DAPServer
 
-import json
+from debug_adapter.common import LOG_LEVEL_TRACE
+from debug_adapter.dap.dap_message import make_event
 
-from debug_adapter.dap.dap_message import DAPEvent
+logger = logging.getLogger(__name__)
+
+_NULL_CONTEXT = nullcontext()
 
 
 class DAPNotifier:
@@ -37,21 +41,16 @@ class DAPNotifier:
         :param event: JSON event object.
         """
         if not self.server.client_conn:
-            print("No client connection. Cannot send event.", flush=True)
+            logger.warning("No client connection. Cannot send event.")
             return
 
-        event_json = json.dumps(event)
-        content_length = len(event_json.encode())
-        header = f"Content-Length: {content_length}\r\n\r\n"
-
         if self.notifier_is_active:
-            self.server.client_conn.sendall((header + event_json).encode())
-            print(f"Sent event: {event}", flush=True)
+            self.server.send_message(event)
+            logger.debug("Sent event: %s", event["event"])
+            logger.log(LOG_LEVEL_TRACE, "Event: %s", event)
         else:
-            print(
-                f"Unable to send event: notifier is not active. Content of event: {event}",
-                flush=True,
-            )
+            logger.debug("Unable to send event %s: notifier is not active", event["event"])
+            logger.log(LOG_LEVEL_TRACE, "Event: %s", event)
 
     def send_stopped_event(
         self,
@@ -68,7 +67,7 @@ class DAPNotifier:
         :param all_threads_stopped: Whether all threads are stopped.
         :param hit_breakpoint_ids: List of breakpoint IDs that were hit.
         """
-        event = DAPEvent(
+        event = make_event(
             event="stopped",
             body={
                 "reason": reason,
@@ -77,7 +76,7 @@ class DAPNotifier:
                 "hitBreakpointIds": hit_breakpoint_ids,
             },
         )
-        self.send_event(event.to_dict())
+        self.send_event(event)
 
     def send_continued_event(
         self,
@@ -90,14 +89,14 @@ class DAPNotifier:
         :param thread_id: ID of the thread that continued execution.
         :param all_threads_continued: Whether all threads are continued.
         """
-        event = DAPEvent(
+        event = make_event(
             event="continued",
             body={
                 "threadId": thread_id,
                 "allThreadsContinued": all_threads_continued,
             },
         )
-        self.send_event(event.to_dict())
+        self.send_event(event)
 
     def send_invalidated_event(self, areas: list[str]):
         """
@@ -105,13 +104,13 @@ class DAPNotifier:
 
         :param areas: List of areas that have been invalidated (eg "stacks").
         """
-        event = DAPEvent(
+        event = make_event(
             event="invalidated",
             body={
                 "areas": areas,
             },
         )
-        self.send_event(event.to_dict())
+        self.send_event(event)
 
     def send_new_process_event(self):
         """Create and dispatches the 'exec-new' event."""
@@ -120,13 +119,13 @@ class DAPNotifier:
         # was created during the launch request (which is most likely), in post-processing
         # we will disconnect from the spawner process and switch to the only available inferior
         # (the new process we need).
-        event = DAPEvent(event="newProcess")
-        self.send_event(event.to_dict())
+        event = make_event(event="newProcess")
+        self.send_event(event)
 
     def send_exited_process_event(self):
         """Create and dispatches the 'exited' event."""
-        event = DAPEvent(event="exitedProcess")
-        self.send_event(event.to_dict())
+        event = make_event(event="exitedProcess")
+        self.send_event(event)
 
     def stop_notifier(self):
         """Deactivate the notifier to prevent sending events to the client."""
@@ -154,14 +153,15 @@ class NullNotifier(DAPNotifier):
     is not desired or available. All methods are implemented as no-ops.
     """
 
-    def __init__(self, *_):
+    notifier_is_active = False
+
+    def __init__(self, *_):  # pylint: disable=super-init-not-called
         """
         Initialize the NullNotifier.
 
         This constructor accepts any arguments, but ignores them because no initialization
-        is necessary for a no-op notifier.
+        is necessary for a no-op notifier. The base initializer is not called either.
         """
-        super().__init__(server=None)
 
     def send_event(self, event: dict):
         """
@@ -222,12 +222,11 @@ class NullNotifier(DAPNotifier):
         This method does nothing; it is provided to adhere to the interface.
         """
 
-    @contextmanager
     def suspend(self):
         """
         No-op context manager that does not change any state.
 
-        This context manager yields control immediately and performs no actions
-        upon entering or exiting the context.
+        Returns a shared `nullcontext`, which performs no actions upon entering
+        or exiting the context.
         """
-        yield
+        return _NULL_CONTEXT
@@ -7,22 +7,60 @@ It translates these requests into appropriate commands for the GDB backend and m
 interaction between the client and the debugger.
 """
 
+import logging
+import mmap
+import os
+import re
 import shlex
 import subprocess  # nosec B404 # noqa: S404
-from collections.abc import Iterator
-from functools import wraps
+import threading
+from collections.abc import Iterable, Iterator
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any
 
 from debug_adapter.common import (
+    LOG_LEVEL_TRACE,
     VAR_REF_LOCAL_BASE,
     VAR_REF_REGISTERS_BASE,
     CommandResult,
 )
-from debug_adapter.dap.dap_message import DAPEvent, DAPResponse
+from debug_adapter.dap.dap_message import make_event, make_response
 from debug_adapter.dap.notifier import DAPNotifier, NullNotifier
 from debug_adapter.gdb.backend import GDBBackend
 
+logger = logging.getLogger(__name__)
+
 ARGUMENTS = "arguments"
 THREAD_ID = "threadId"
+# Shared arguments of requests sent without them
+NO_ARGUMENTS: MappingProxyType[str, Any] = MappingProxyType({})
+SOURCE_MMAP_THRESHOLD = 256 * 1024  # Source files from this size are decoded from a memory map
+SOURCE_CACHE_SIZE = 32  # Number of recently read source files kept in memory
+# Program arguments that `shlex.quote` would return unchanged
+_is_shell_safe = re.compile(r"[\w@%+=:,./-]+", re.ASCII).fullmatch
+
+# Capabilities reported in the `initialize` response.
+# TODO: check the settings on the different gdb
+INITIALIZE_CAPABILITIES = MappingProxyType(
+    {
+        "SupportsConfigurationDoneRequest": True,
+        "SupportsCompletionsRequest": False,  # TODO maybe someday (request completions)
+        "SupportsEvaluateForHovers": False,  # TODO request evaluate
+        "SupportsSetVariable": True,
+        "SupportsFunctionBreakpoints": True,  # Check
+        "SupportsConditionalBreakpoints": True,  # Check
+        "SupportsDataBreakpoints": True,  # Check
+        "SupportsClipboardContext": False,
+        "SupportsLogPoints": False,
+        "SupportsReadMemoryRequest": True,
+        "SupportsModulesRequest": True,
+        "SupportsGotoTargetsRequest": False,
+        "SupportsDisassembleRequest": True,  # Check
+        "SupportsValueFormattingOptions": True,
+        "SupportsBreakpointLocationsRequest": True,
+    },
+)
 
 
 def register_command(name: str):
@@ -30,21 +68,38 @@ def register_command(name: str):
     Register a method as a DAP command.
 
     :param name: The name of the command to register.
-    :return: The decorated function with the `_dap_command` attribute.
+    :return: The same function with the `_dap_command` attribute set.
     """
 
     def decorator(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            return func(*args, **kwargs)
-
-        wrapper._dap_command = name  # noqa: WPS437 # pylint: disable=W0212
-        return wrapper
+        func._dap_command = name  # noqa: WPS437 # pylint: disable=W0212
+        return func
 
     return decorator
 
 
-class DAPRequestHandler:
+class _CommandRegistry(type):
+    """
+    Metaclass that collects the methods registered with `register_command`.
+
+    The command table is built once per class, so handler instances only have to bind
+    the registered methods instead of scanning all of their attributes.
+    """
+
+    _command_table: dict[str, str]
+
+    def __init__(cls, name, bases, namespace, **kwargs):
+        """Build the `command name -> method name` table, extending the one of the bases."""
+        super().__init__(name, bases, namespace, **kwargs)
+        command_table = dict(getattr(cls, "_command_table", {}))
+        for attr_name, attr in namespace.items():
+            command = getattr(attr, "_dap_command", None)
+            if command is not None:
+                command_table[command] = attr_name
+        cls._command_table = command_table
+
+
+class DAPRequestHandler(metaclass=_CommandRegistry):
     """Client request handler via Debug Adapter Protocol (DAP)."""
 
     def __init__(self, gdb_backend: GDBBackend):
@@ -55,12 +110,10 @@ class DAPRequestHandler:
         """
         self.gdb_backend = gdb_backend
         self._notifier: DAPNotifier = NullNotifier()
-        self._commands = {}
-
-        for attr_name in dir(self):
-            attr = getattr(self, attr_name)
-            if callable(attr) and hasattr(attr, "_dap_command"):
-                self._commands[attr._dap_command] = attr  # noqa: WPS437
+        self._commands = {
+            command: getattr(self, attr_name)
+            for command, attr_name in type(self)._command_table.items()
+        }
 
     @property
     def notifier(self) -> DAPNotifier:
@@ -73,73 +126,69 @@ class DAPRequestHandler:
         self._notifier = value
         self.gdb_backend.notifier = value
 
-    def handle_request(self, request: dict) -> Iterator[dict]:
+    def handle_request(self, request: dict) -> Iterable[dict]:
         """
         Process a client request and returns a response.
 
+        Most handlers return their messages as a list. Handlers that keep working after
+        their response is sent (e.g. `attach`, which then sends a `stopped` event) are
+        generators, so the response is sent first.
+
         :param request: JSON request from client.
-        :return: JSON response for client.
+        :return: JSON responses and events for client.
         """
-        command = request.get("command")
-        print(f"Handling DAP command: {request}", flush=True)
+        command = request.get("command", "")
+        logger.debug("Handling DAP command: %s", command)
+        logger.log(LOG_LEVEL_TRACE, "Request: %s", request)
 
-        if command in self._commands:
-            yield from self._commands.get(command, self._unsupported_command)(request)
-        else:
-            yield from self._unsupported_command(request)
+        handler = self._commands.get(command, self._unsupported_command)
+        return handler(request)
 
     @register_command("initialize")
-    def _initialize(self, request: dict) -> Iterator[dict]:
+    def _initialize(self, request: dict) -> list[dict]:
         """Process the command `initialize`."""
-        response = DAPResponse(
-            request=request,
-            command="initialize",
-            # TODO: check the settings on the different gdb
-            body={
-                "SupportsConfigurationDoneRequest": True,
-                "SupportsCompletionsRequest": False,  # TODO maybe someday (request completions)
-                "SupportsEvaluateForHovers": False,  # TODO request evaluate
-                "SupportsSetVariable": True,
-                "SupportsFunctionBreakpoints": True,  # Check
-                "SupportsConditionalBreakpoints": True,  # Check
-                "SupportsDataBreakpoints": True,  # Check
-                "SupportsClipboardContext": False,
-                "SupportsLogPoints": False,
-                "SupportsReadMemoryRequest": True,
-                "SupportsModulesRequest": True,
-                "SupportsGotoTargetsRequest": False,
-                "SupportsDisassembleRequest": True,  # Check
-                "SupportsValueFormattingOptions": True,
-                "SupportsBreakpointLocationsRequest": True,
-            },
-        )
-        yield response.to_dict()
-        event = DAPEvent(event="initialized")
-        yield event.to_dict()
+        return [
+            make_response(
+                request=request,
+                command="initialize",
+                body=INITIALIZE_CAPABILITIES,
+            ),
+            make_event(event="initialized"),
+        ]
 
     @register_command("configurationDone")
-    def _configuration_done(self, request: dict) -> Iterator[dict]:
+    def _configuration_done(self, request: dict) -> list[dict]:
         """Process the command `configurationDone`."""
-        response = DAPResponse(
-            request=request,
-            command="configurationDone",
-            body={},
-        )
-        yield response.to_dict()
+        return [
+            make_response(
+                request=request,
+                command="configurationDone",
+            ),
+        ]
 
     def _set_custom_settings(self, request: dict) -> CommandResult:
-        setup_commands = self._get_argument(request, "setupCommands", [])
-        send_cmd = self.gdb_backend.send_command_and_check_for_success
-        for command in setup_commands:
-            command_text = command.get("text")
-
-            if command_text:
-                ignore_failures = command.get("ignoreFailures", False)
-                result: CommandResult = send_cmd(command_text, ignore_failures)
-                if not result.success:
-                    return result
-
-        gdb_server_address = self._get_argument(request, "gdbServer")
+        arguments = self._get_arguments(request)
+        setup_commands = [
+            (command["text"], command.get("ignoreFailures", False))
+            for command in arguments.get("setupCommands", [])
+            if command.get("text")
+        ]
+        if setup_commands:
+            # Setup commands may change the `scheduler-locking` mode set for step-out
+            self.gdb_backend.execution_manager.forget_scheduler_locking()
+        # Commands are sent together up to and including the next one whose failure is not
+        # ignored, so the commands after a failed one are not run
+        batch: list[tuple[str, bool]] = []
+        for index, (command, ignore_failures) in enumerate(setup_commands):
+            batch.append((command, ignore_failures))
+            if ignore_failures and index < len(setup_commands) - 1:
+                continue
+            result = self.gdb_backend.send_commands_and_check_for_success(batch)[-1]
+            if not result.success:
+                return result
+            batch = []
+
+        gdb_server_address = arguments.get("gdbServer")
         if gdb_server_address:
             return self.gdb_backend.process_manager.connect_to_gdbserver(gdb_server_address)
         return CommandResult(success=True, message="")
@@ -150,19 +199,19 @@ class DAPRequestHandler:
         result: CommandResult = self._set_custom_settings(request)
 
         if result.success:
-            pid = self._get_argument(request, "pid")
-            print(f"Attaching to process with PID: {pid}")
+            arguments = self._get_arguments(request)
+            pid = arguments.get("pid")
+            logger.info("Attaching to process with PID: %s", pid)
 
-            program_path = self._get_argument(request, "program")
+            program_path = arguments.get("program")
             result = self.gdb_backend.process_manager.attach_to_process(pid, program_path)
 
-        response = DAPResponse(
+        yield make_response(
             request=request,
             command="attach",
             success=result.success,
             message=result.message,
         )
-        yield response.to_dict()
 
         # TODO: depending on the user's settings whether he wants to stop execution.
         self.notifier.start_notifier()
@@ -174,7 +223,7 @@ class DAPRequestHandler:
         )
 
     @register_command("launch")
-    def _launch(self, request: dict) -> Iterator[dict]:
+    def _launch(self, request: dict) -> list[dict]:
         """Process the command launch."""
         result: CommandResult = self._set_custom_settings(request)
         spawner_pid = None
@@ -185,16 +234,17 @@ class DAPRequestHandler:
             else:
                 result, spawner_pid = self._launch_by_default(request)
 
-        response = DAPResponse(
-            request=request,
-            command="launch",
-            success=result.success,
-            message=result.message,
-            body={
-                "spawnerPid": spawner_pid,
-            },
-        )
-        yield response.to_dict()
+        return [
+            make_response(
+                request=request,
+                command="launch",
+                success=result.success,
+                message=result.message,
+                body={
+                    "spawnerPid": spawner_pid,
+                },
+            ),
+        ]
 
     def _launch_via_runner(
         self,
@@ -215,24 +265,31 @@ class DAPRequestHandler:
                 success=False,
                 message="processSpawner not specified",
             ), None
-        spawner_pid = self.gdb_backend.process_manager.get_pid_by_name(process_spawner)
+        process_manager = self.gdb_backend.process_manager
+        spawner_pid = process_manager.get_pid_by_name(process_spawner)
         if not spawner_pid:
             return CommandResult(
                 success=False,
                 message=f"Unable to find the process {process_spawner}",
             ), None
 
-        result: CommandResult = self.gdb_backend.process_manager.attach_to_process(spawner_pid)
+        result: CommandResult = process_manager.attach_to_process(spawner_pid)
         self.gdb_backend.breakpoint_manager.set_exec_catchpoint()
         self.gdb_backend.execution_manager.continue_execution()
         self.notifier.start_notifier()
-        with subprocess.Popen(  # noqa: S603
+        bash_process = subprocess.Popen(  # noqa: S603 # pylint: disable=consider-using-with
             [
                 "/bin/bash",
                 program_runner,
             ],
-        ) as bash_process:  # nosec B603
-            bash_process.wait()
+        )  # nosec B603
+        # The runner is reaped in the background, so requests are handled while it runs.
+        threading.Thread(
+            target=_wait_for_runner,
+            args=(bash_process,),
+            name="program-runner",
+            daemon=True,
+        ).start()
         return result, spawner_pid
 
     def _launch_by_default(self, request: dict) -> tuple[CommandResult, int | None]:
@@ -242,67 +299,62 @@ class DAPRequestHandler:
         Loading symbols from executable file, setting arguments,
         launching the application and calling pause_execution after startup.
         """
-        program_path = self._get_argument(request, "program")
-        program_args = self._get_argument(request, "args") or []
-        result: CommandResult = self.gdb_backend.execution_manager.load_executable_and_symbols(
-            program_path,
-        )
+        arguments = self._get_arguments(request)
+        program_path = arguments.get("program")
+        program_args = arguments.get("args") or []
+        execution_manager = self.gdb_backend.execution_manager
+        result: CommandResult = execution_manager.load_executable_and_symbols(program_path)
         if not result.success:
             return result, None
 
-        arg_string = ""
-        if program_args:
-            quoted_args = [shlex.quote(arg) for arg in program_args]
-            arg_string = " ".join(quoted_args)
-
-        self.gdb_backend.execution_manager.set_program_arguments(arg_string)
+        arg_string = " ".join(
+            [arg if _is_shell_safe(arg) else shlex.quote(arg) for arg in program_args],
+        )
+        execution_manager.set_program_arguments(arg_string)
         result = self.gdb_backend.breakpoint_manager.set_breakpoint_on_main()
         self.notifier.start_notifier()
-        self.gdb_backend.execution_manager.exec_run()
+        execution_manager.exec_run()
 
         return CommandResult(success=True, message=""), None
 
     @register_command("handleNewProcess")
     def _handle_new_process(self, request: dict) -> Iterator[dict]:
         """Process the command `handleNewProcess`."""
-        program_runner = self._get_argument(request, "spawnerPid")
-        program_path = self._get_argument(request, "program")
-        self.gdb_backend.process_manager.detach_inferiors_with_pids([program_runner])
-        result: CommandResult = self.gdb_backend.process_manager.load_program_symbols(program_path)
-        processes: list = []
-        if result.success:
-            result = self.gdb_backend.breakpoint_manager.set_breakpoint_on_main()
-        if result.success:
-            result, processes = self.gdb_backend.process_manager.get_processes()
-        current_pid = self.gdb_backend.process_manager.get_current_pid()
-
-        response = DAPResponse(
+        arguments = self._get_arguments(request)
+        program_runner = arguments.get("spawnerPid")
+        program_path = arguments.get("program")
+        process_manager = self.gdb_backend.process_manager
+        process_manager.detach_inferiors_with_pids([program_runner])
+        result, processes, current_pid = process_manager.prepare_new_process(program_path)
+
+        yield make_response(
             request=request,
             command="handleNewProcess",
             success=result.success,
             message=result.message,
             body={"processes": processes, "currentProcess": current_pid},
         )
-        yield response.to_dict()
         self.gdb_backend.execution_manager.continue_execution()
 
     @register_command("listProcesses")
-    def _list_processes(self, request: dict) -> Iterator[dict]:
+    def _list_processes(self, request: dict) -> list[dict]:
         """Process the command `listProcesses`."""
-        result, processes = self.gdb_backend.process_manager.get_processes()
-        current_pid = self.gdb_backend.process_manager.get_current_pid()
+        process_manager = self.gdb_backend.process_manager
+        result, processes = process_manager.get_processes()
+        current_pid = process_manager.get_current_pid()
 
-        response = DAPResponse(
-            request=request,
-            command="listProcesses",
-            success=result.success,
-            message=result.message,
-            body={"processes": processes, "currentProcess": current_pid},
-        )
-        yield response.to_dict()
+        return [
+            make_response(
+                request=request,
+                command="listProcesses",
+                success=result.success,
+                message=result.message,
+                body={"processes": processes, "currentProcess": current_pid},
+            ),
+        ]
 
     @register_command("addInferiors")
-    def _add_inferiors(self, request: dict) -> Iterator[dict]:
+    def _add_inferiors(self, request: dict) -> list[dict]:
         """Process the command `addInferiors`."""
         pids = self._get_argument(request, "pids", [])
         # When adding inferiors, gdb briefly starts and stops the program being debugged.
@@ -310,22 +362,15 @@ class DAPRequestHandler:
         with self.notifier.suspend():
             self.gdb_backend.process_manager.add_inferior_with_pids(pids)
 
-        response = {
-            "type": "response",
-            "request_seq": request.get("seq", 0),
-            "command": "addInferiors",
-            "success": True,
-            "message": "",
-            "body": {},
-        }
-        yield response
+        return [make_response(request=request, command="addInferiors")]
 
     @register_command("detachInferiors")
-    def _detach_inferiors(self, request: dict):
+    def _detach_inferiors(self, request: dict) -> list[dict]:
         """Process the command `detachInferiors`."""
         pids = self._get_argument(request, "pids", [])
-        self.gdb_backend.process_manager.detach_inferiors_with_pids(pids)
-        current_pid = self.gdb_backend.process_manager.get_current_pid()
+        process_manager = self.gdb_backend.process_manager
+        process_manager.detach_inferiors_with_pids(pids)
+        current_pid = process_manager.get_current_pid()
 
         # Send events to update the client's state
         self.notifier.send_continued_event(thread_id="1", all_threads_continued=True)
@@ -336,209 +381,231 @@ class DAPRequestHandler:
             hit_breakpoint_ids=[],
         )
 
-        response = {
-            "type": "response",
-            "request_seq": request.get("seq", 0),
-            "command": "detachInferiors",
-            "success": True,
-            "message": "",
-            "body": {"processes": current_pid, "newCurrentPid": current_pid},
-        }
-
-        yield response
+        return [
+            make_response(
+                request=request,
+                command="detachInferiors",
+                body={"processes": current_pid, "newCurrentPid": current_pid},
+            ),
+        ]
 
     @register_command("selectInferior")
-    def _select_inferior(self, request: dict):
+    def _select_inferior(self, request: dict) -> list[dict]:
         """Process the command `selectInferior`."""
         pid = self._get_argument(request, "pid")
 
         success = self.gdb_backend.process_manager.select_inferior_by_pid(pid)
 
-        response = {
-            "type": "response",
-            "request_seq": request.get("seq", 0),
-            "command": "selectInferior",
-            "success": success,
-            "message": "Switched to inferior"
-            if success
-            else f"Failed to switch to inferior for PID {pid}",
-            "body": {},
-        }
-
-        yield response
+        return [
+            make_response(
+                request=request,
+                command="selectInferior",
+                success=success,
+                message="Switched to inferior"
+                if success
+                else f"Failed to switch to inferior for PID {pid}",
+            ),
+        ]
 
     @register_command("evaluate")
-    def _evaluate(self, request: dict):
+    def _evaluate(self, request: dict) -> list[dict]:
         """Process the command `evaluate`."""
         expression = self._get_argument(request, "expression", "")
 
         responses = self.gdb_backend.send_command_and_get_result(expression)
+        # The expression may be any command, e.g. one that changes `scheduler-locking`
+        self.gdb_backend.execution_manager.forget_scheduler_locking()
 
-        response = {
-            "type": "response",
-            "request_seq": request.get("seq", 0),
-            "command": "evaluate",
-            "success": True,
-            "body": {"result": responses},
-        }
-
-        yield response
+        return [
+            make_response(
+                request=request,
+                command="evaluate",
+                body={"result": responses},
+            ),
+        ]
 
     @register_command("continueAfterProcessExit")
-    def _continue_after_process_exit(self, request: dict):
+    def _continue_after_process_exit(self, request: dict) -> list[dict]:
         continue_debugging = False
-        if self.gdb_backend.process_manager.get_inferiors_list():
+        process_manager = self.gdb_backend.process_manager
+        if process_manager.get_inferiors_list():
             continue_debugging = True
-            self.gdb_backend.process_manager.get_current_inferior()
+            process_manager.get_current_inferior()
             # Refresh gdb and client state
-            self.gdb_backend.execution_manager.continue_execution()
-            self.gdb_backend.execution_manager.pause_execution()
-        response = DAPResponse(
-            request=request,
-            command="continueAfterProcessExit",
-            body={
-                "continue": continue_debugging,
-            },
-        )
-        yield response.to_dict()
+            execution_manager = self.gdb_backend.execution_manager
+            execution_manager.continue_execution()
+            execution_manager.pause_execution()
+        return [
+            make_response(
+                request=request,
+                command="continueAfterProcessExit",
+                body={
+                    "continue": continue_debugging,
+                },
+            ),
+        ]
 
     @register_command("threads")
-    def _threads(self, request: dict) -> Iterator[dict]:
+    def _threads(self, request: dict) -> list[dict]:
         """Process the command `threads`."""
         success, message, threads = self.gdb_backend.thread_manager.get_threads()
-        response = DAPResponse(
-            request=request,
-            command="threads",
-            success=success,
-            message=message,
-            body={
-                "threads": threads,
-            },
-        )
-        yield response.to_dict()
+        return [
+            make_response(
+                request=request,
+                command="threads",
+                success=success,
+                message=message,
+                body={
+                    "threads": threads,
+                },
+            ),
+        ]
 
     @register_command("stackTrace")  # TODO: With startFrame and levels
-    def _stack_trace(self, request: dict) -> Iterator[dict]:
+    def _stack_trace(self, request: dict) -> list[dict]:
         """Process the command `stackTrace`."""
-        response = DAPResponse(
-            request=request,
-            command="stackTrace",
-        )
-
         thread_id = self._get_argument(request, THREAD_ID)
         if thread_id is None:
-            response.success = False
-            response.message = "'threadId' is required for stackTrace request"
-            yield response.to_dict()
+            return [
+                make_response(
+                    request=request,
+                    command="stackTrace",
+                    success=False,
+                    message="'threadId' is required for stackTrace request",
+                ),
+            ]
 
         success, message, stack_frames = self.gdb_backend.stack_trace_manager.get_stack_trace(
             thread_id,
         )
-        response_body = {"stackFrames": stack_frames}
-        response.success = success
-        response.message = message
-        response.body = response_body
-        yield response.to_dict()
+        return [
+            make_response(
+                request=request,
+                command="stackTrace",
+                success=success,
+                message=message,
+                body={"stackFrames": stack_frames},
+            ),
+        ]
 
     @register_command("continue")
-    def _continue(self, request: dict) -> Iterator[dict]:
+    def _continue(self, request: dict) -> list[dict]:
         """Process the command `continue`."""
         thread_id = self._get_argument(request, THREAD_ID)
 
         result: CommandResult = self.gdb_backend.execution_manager.continue_execution(thread_id)
 
-        response = DAPResponse(
-            request=request,
-            command="continue",
-            success=result.success,
-            message=result.message,
-        )
-        yield response.to_dict()
+        return [
+            make_response(
+                request=request,
+                command="continue",
+                success=result.success,
+                message=result.message,
+            ),
+        ]
 
     @register_command("pause")
-    def _pause(self, request: dict) -> Iterator[dict]:
+    def _pause(self, request: dict) -> list[dict]:
         """Process the command `pause`."""
         thread_id = self._get_argument(request, THREAD_ID)
 
         result: CommandResult = self.gdb_backend.execution_manager.pause_execution(thread_id)
 
-        response = DAPResponse(
-            request=request,
-            command="pause",
-            success=result.success,
-            message=result.message,
-        )
-        yield response.to_dict()
+        return [
+            make_response(
+                request=request,
+                command="pause",
+                success=result.success,
+                message=result.message,
+            ),
+        ]
 
     @register_command("disconnect")
-    def _disconnect(self, request: dict) -> Iterator[dict]:
+    def _disconnect(self, request: dict) -> list[dict]:
         """Process the command `disconnect`."""
         self.gdb_backend.stop()
-        response = DAPResponse(
-            request=request,
-            command="disconnect",
-        )
-        yield response.to_dict()
+        return [
+            make_response(
+                request=request,
+                command="disconnect",
+            ),
+        ]
 
     @register_command("source")
-    def _source(self, request: dict) -> Iterator[dict]:
+    def _source(self, request: dict) -> list[dict]:
         """Process the command `source`."""
-        response = DAPResponse(
-            request=request,
-            command="source",
-        )
-
-        arguments = request.get(ARGUMENTS, {})
+        arguments = self._get_arguments(request)
         source = arguments.get("source", {})
         source_path = source.get("path")
 
         if not source_path:
-            response.success = False
-            response.message = "The 'path' field is required in the 'source' object."
-            yield response.to_dict()
-            return
+            return [
+                make_response(
+                    request=request,
+                    command="source",
+                    success=False,
+                    message="The 'path' field is required in the 'source' object.",
+                ),
+            ]
 
         # Attempt to read the source file
         try:
-            with open(source_path, encoding="utf-8") as source_file:
-                source_content = source_file.read()
-
-            response.success = True
-            response.body = {
-                "content": source_content,
-            }
+            source_content = _read_source(source_path)
         except FileNotFoundError:
-            response.success = False
-            response.message = f"Source file not found: {source_path}"
+            return [
+                make_response(
+                    request=request,
+                    command="source",
+                    success=False,
+                    message=f"Source file not found: {source_path}",
+                ),
+            ]
         except OSError as err:
-            response.success = False
-            response.message = f"Error reading source file: {err}"
-
-        yield response.to_dict()
+            return [
+                make_response(
+                    request=request,
+                    command="source",
+                    success=False,
+                    message=f"Error reading source file: {err}",
+                ),
+            ]
+
+        return [
+            make_response(
+                request=request,
+                command="source",
+                body={
+                    "content": source_content,
+                },
+            ),
+        ]
 
     @register_command("scopes")
-    def _scopes(self, request: dict) -> Iterator[dict]:
+    def _scopes(self, request: dict) -> list[dict]:
         """Process the command `scopes`."""
-        response = DAPResponse(
-            request=request,
-            command="scopes",
-        )
-
-        arguments = request.get(ARGUMENTS, {})
+        arguments = self._get_arguments(request)
         frame_id = arguments.get("frameId")
 
         if frame_id is None:
-            response.success = False
-            response.message = "The 'frameId' field is required in the arguments."
-            yield response.to_dict()
-            return
+            return [
+                make_response(
+                    request=request,
+                    command="scopes",
+                    success=False,
+                    message="The 'frameId' field is required in the arguments.",
+                ),
+            ]
 
         result: CommandResult = self.gdb_backend.select_frame(frame_id)
-        response.success = result.success
-        response.message = result.message
-        if not response.success:
-            yield response.to_dict()
-            return
+        if not result.success:
+            return [
+                make_response(
+                    request=request,
+                    command="scopes",
+                    success=result.success,
+                    message=result.message,
+                ),
+            ]
 
         locals_scope = {
             "name": "Locals",
@@ -559,67 +626,69 @@ class DAPRequestHandler:
         if self.gdb_backend.variable_manager.check_for_registers():
             scopes.append(registers_scope)
 
-        response.success = True
-        response.body = {
-            "scopes": scopes,
-        }
-
-        yield response.to_dict()
+        return [
+            make_response(
+                request=request,
+                command="scopes",
+                body={
+                    "scopes": scopes,
+                },
+            ),
+        ]
 
     @register_command("variables")
-    def _variables(self, request: dict) -> Iterator[dict]:
+    def _variables(self, request: dict) -> list[dict]:
         """Process the `variables` request."""
-        response = DAPResponse(
-            request=request,
-            command="variables",
-        )
-
-        arguments = request.get(ARGUMENTS, {})
+        arguments = self._get_arguments(request)
         variables_reference = arguments.get("variablesReference")
 
         if variables_reference is None:
-            response.success = False
-            response.message = "The 'variablesReference' field is required."
-            yield response.to_dict()
-            return
+            return [
+                make_response(
+                    request=request,
+                    command="variables",
+                    success=False,
+                    message="The 'variablesReference' field is required.",
+                ),
+            ]
 
         try:
             variables = self.gdb_backend.variable_manager.get_vars(variables_reference)
-
-            response.success = True
-            response.body = {
-                "variables": [
-                    {
-                        "name": var["name"],
-                        "value": var.get("value", "<unknown>"),
-                        "variablesReference": var["variablesReference"],
-                    }
-                    for var in variables
-                ],
-            }
         except (RuntimeError, KeyError, ValueError, TypeError, AttributeError) as err:
-            response.success = False
-            response.message = f"Failed to fetch variables: {err}"
-
-        yield response.to_dict()
+            return [
+                make_response(
+                    request=request,
+                    command="variables",
+                    success=False,
+                    message=f"Failed to fetch variables: {err}",
+                ),
+            ]
+
+        return [
+            make_response(
+                request=request,
+                command="variables",
+                body={"variables": variables},
+            ),
+        ]
 
     @register_command("breakpointLocations")
-    def _breakpoint_locations(self, request: dict) -> Iterator[dict]:
+    def _breakpoint_locations(self, request: dict) -> list[dict]:
         """Process the `breakpointLocations` command, returning possible breakpoints."""
-        arguments = request.get("arguments", {})
+        arguments = self._get_arguments(request)
         source_path = arguments.get("source", {}).get("path", "")
         line = arguments.get("line")
         end_line = arguments.get("endLine")
 
         if not source_path or line is None:
-            response = DAPResponse(
-                request=request,
-                command="breakpointLocations",
-                success=False,
-                message="Invalid arguments: source path and line are required.",
-            )
-            yield response.to_dict()
-            return
+            return [
+                make_response(
+                    request=request,
+                    command="breakpointLocations",
+                    success=False,
+                    message="Invalid arguments: source path and line are required.",
+                ),
+            ]
 
         success, message, locations = self.gdb_backend.breakpoint_manager.get_breakpoint_locations(
             source_path,
@@ -627,127 +696,114 @@ class DAPRequestHandler:
             end_line,
         )
 
-        response = DAPResponse(
-            request=request,
-            command="breakpointLocations",
-            success=success,
-            message=message,
-            body={"breakpoints": locations},
-        )
-        yield response.to_dict()
+        return [
+            make_response(
+                request=request,
+                command="breakpointLocations",
+                success=success,
+                message=message,
+                body={"breakpoints": locations},
+            ),
+        ]
 
     @register_command("setBreakpoints")
-    def _set_breakpoints(self, request: dict) -> Iterator[dict]:
+    def _set_breakpoints(self, request: dict) -> list[dict]:
         """Process the `setBreakpoints` command, setting breakpoints in GDB."""
-        arguments = request.get("arguments", {})
+        arguments = self._get_arguments(request)
         source_path = arguments.get("source", {}).get("path", "")
         breakpoints = arguments.get("breakpoints", [])
 
         if not source_path:
-            response = DAPResponse(
-                request=request,
-                command="setBreakpoints",
-                success=False,
-                message="Invalid arguments: source path is required.",
+            return [
+                make_response(
+                    request=request,
+                    command="setBreakpoints",
+                    success=False,
+                    message="Invalid arguments: source path is required.",
+                ),
+            ]
+
+        success, message, result_breakpoints = (
+            self.gdb_backend.breakpoint_manager.update_source_breakpoints(
+                source_path,
+                breakpoints,
             )
-            yield response.to_dict()
-            return
-
-        self.gdb_backend.breakpoint_manager.clear_breakpoints(source_path)
-
-        result_breakpoints: list = []
-        message = ""
-        success = True
-
-        if breakpoints:
-            success, message, result_breakpoints = (
-                self.gdb_backend.breakpoint_manager.set_breakpoints(
-                    source_path,
-                    breakpoints,
-                )
-            )
-
-        response = DAPResponse(
-            request=request,
-            command="setBreakpoints",
-            success=success,
-            message=message,
-            body={"breakpoints": result_breakpoints},
         )
-        yield response.to_dict()
+
+        return [
+            make_response(
+                request=request,
+                command="setBreakpoints",
+                success=success,
+                message=message,
+                body={"breakpoints": result_breakpoints},
+            ),
+        ]
 
     @register_command("next")
-    def _next(self, request: dict) -> Iterator[dict]:
+    def _next(self, request: dict) -> list[dict]:
         """Process the command `next`."""
         thread_id = self._get_argument(request, THREAD_ID)
 
-        response = DAPResponse(
-            request=request,
-            command="next",
-            success=True,
-            message="",
-        )
-
         result: CommandResult = self.gdb_backend.execution_manager.execute_next(thread_id)
 
-        if not result.success:
-            response.success = False
-            response.message = result.message
-        yield response.to_dict()
+        return [
+            make_response(
+                request=request,
+                command="next",
+                success=result.success,
+                message=result.message,
+            ),
+        ]
 
     @register_command("stepIn")
-    def _step_in(self, request: dict) -> Iterator[dict]:
+    def _step_in(self, request: dict) -> list[dict]:
         """Process the command `stepIn`."""
         thread_id = self._get_argument(request, THREAD_ID)
 
-        response = DAPResponse(
-            request=request,
-            command="stepIn",
-            success=True,
-            message="",
-        )
-
         result: CommandResult = self.gdb_backend.execution_manager.execute_step_in(thread_id)
 
-        if not result.success:
-            response.success = False
-            response.message = result.message
-        yield response.to_dict()
+        return [
+            make_response(
+                request=request,
+                command="stepIn",
+                success=result.success,
+                message=result.message,
+            ),
+        ]
 
     @register_command("stepOut")
-    def _step_out(self, request: dict) -> Iterator[dict]:
+    def _step_out(self, request: dict) -> list[dict]:
         """Process the command `stepOut`."""
-        thread_id = self._get_argument(request, self._get_argument(request, "pid"), None)
-        single_thread_default = False
-        single_thread = self._get_argument(request, "singleThread", single_thread_default)
-
-        response = DAPResponse(
-            request=request,
-            command="stepOut",
-            success=True,
-            message="",
-        )
+        arguments = self._get_arguments(request)
+        thread_id = arguments.get(THREAD_ID)
+        single_thread = arguments.get("singleThread", False)
 
         result: CommandResult = self.gdb_backend.execution_manager.execute_step_out(
             thread_id,
             single_thread,
         )
 
-        if not result.success:
-            response.success = False
-            response.message = result.message
-        yield response.to_dict()
+        return [
+            make_response(
+                request=request,
+                command="stepOut",
+                success=result.success,
+                message=result.message,
+            ),
+        ]
 
-    def _unsupported_command(self, request: dict) -> Iterator[dict]:
+    def _unsupported_command(self, request: dict) -> list[dict]:
         """Generate a response to an unsupported command."""
         command = request.get("command", "unknown")
-        response = DAPResponse(
-            request=request,
-            success=False,
-            command=command,
-            message=f"Unsupported command: {command}",
-        )
-        yield response.to_dict()
+        return [
+            make_response(
+                request=request,
+                success=False,
+                command=command,
+                message=f"Unsupported command: {command}",
+            ),
+        ]
 
     def _get_argument(self, request: dict, key: str, default=None):
         """
@@ -758,4 +814,63 @@ class DAPRequestHandler:
         :param default: Default value if the key is missing.
         :return: Argument value or default.
         """
-        return request.get(ARGUMENTS, {}).get(key, default)
+        return self._get_arguments(request).get(key, default)
+
+    def _get_arguments(self, request: dict):
+        """
+        Retrieve request[ARGUMENTS].
+
+        Handlers that read several arguments fetch them once with this method.
+
+        :param request: DAP input request.
+        :return: Arguments of the request (a shared read-only mapping if there are none).
+        """
+        return request.get(ARGUMENTS) or NO_ARGUMENTS
+
+
+def _read_source(path: str) -> str:
+    """
+    Read a source file as UTF-8 text, reusing the content of unchanged files.
+
+    Clients fetch the same sources again while navigating the stack, so the content is cached
+    by path, modification time and size: a modified file gets a new cache key.
+
+    :param path: Path to the source file.
+    :return: Content of the file.
+    """
+    stat = os.stat(path)
+    return _read_source_file(path, stat.st_mtime_ns, stat.st_size)
+
+
+@lru_cache(maxsize=SOURCE_CACHE_SIZE)
+def _read_source_file(
+    path: str,
+    mtime_ns: int,  # pylint: disable=unused-argument
+    size: int,
+) -> str:
+    """
+    Read a source file as UTF-8 text.
+
+    Small files are read in one call. Large files are decoded straight from a memory map,
+    so only the resulting string is allocated instead of an intermediate bytes copy as well.
+
+    :param path: Path to the source file.
+    :param mtime_ns: Modification time of the file, part of the cache key only.
+    :param size: Size of the file.
+    :return: Content of the file.
+    """
+    with open(path, "rb") as source_file:
+        if size < SOURCE_MMAP_THRESHOLD:
+            return source_file.read().decode("utf-8")
+        with mmap.mmap(source_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return str(mapped, "utf-8")
+
+
+def _wait_for_runner(process: subprocess.Popen):
+    """
+    Wait for the program runner to exit and log its exit code.
+
+    :param process: The program runner process.
+    """
+    return_code = process.wait()
+    logger.info("Program runner exited with code %s", return_code)
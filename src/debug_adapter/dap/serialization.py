@@ -0,0 +1,85 @@
+"""
+JSON serialization helpers for the Debug Adapter Protocol (DAP) transport.
+
+`orjson` is used when it is installed, otherwise the standard `json` module is used.
+In both cases `dumps` returns UTF-8 encoded bytes, so callers can frame and send
+the result without an extra encode step, and `loads` accepts the raw bytes of a message body.
+
+Read-only mappings (e.g. `types.MappingProxyType` constants shared between messages)
+are serialized as JSON objects.
+"""
+
+import json
+from collections.abc import Mapping
+from functools import lru_cache
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # orjson is an optional dependency
+    orjson = None  # type: ignore[assignment]
+
+CONTENT_LENGTH_HEADER = b"Content-Length: %d\r\n\r\n"
+
+
+def dumps(obj: Any) -> bytes:
+    """
+    Serialize an object to JSON.
+
+    :param obj: JSON-serializable object (DAP message).
+    :return: UTF-8 encoded JSON document.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default)
+    return json.dumps(obj, default=_default).encode()
+
+
+def loads(data: bytes | bytearray) -> Any:
+    """
+    Deserialize a JSON document.
+
+    :param data: UTF-8 encoded JSON document (DAP message body).
+    :return: Deserialized object.
+    :raises json.JSONDecodeError: If the document is not valid JSON.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _default(obj: Any) -> dict:
+    """
+    Convert objects the JSON encoders do not support natively.
+
+    :param obj: Object that could not be serialized.
+    :return: Serializable representation of the object.
+    :raises TypeError: If the object type is not supported.
+    """
+    if isinstance(obj, Mapping):
+        return dict(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+@lru_cache(maxsize=1024)
+def content_length_header(length: int) -> bytes:
+    """
+    Build the DAP message header for a payload of the given length.
+
+    Headers are cached: many messages (e.g. events without a body or step responses)
+    have the same length throughout a session.
+
+    :param length: Payload length in bytes.
+    :return: ASCII header including the terminating blank line.
+    """
+    return CONTENT_LENGTH_HEADER % length
+
+
+def encode_message(message: dict) -> list[bytes]:
+    """
+    Encode a DAP message into wire buffers.
+
+    :param message: DAP message (response or event).
+    :return: Header and JSON payload, ready to be written with a single gather write.
+    """
+    payload = dumps(message)
+    return [content_length_header(len(payload)), payload]
@@ -12,17 +12,36 @@ to delegate request handling and uses the `DAPNotifier` to send events to the cl
 """
 
 import atexit
-import json
+import contextlib
+import io
+import logging
+import queue
+import re
 import socket
 import tempfile
-from collections.abc import Iterator
+import threading
 from pathlib import Path
 
 from debug_adapter.dap.notifier import DAPNotifier, NullNotifier
 from debug_adapter.dap.request_handler import DAPRequestHandler
+from debug_adapter.dap.serialization import encode_message, loads
 
 JSON_DECODE_ERROR = -32700
 INTERNAL_JSON_RPC_ERROR = -32603
+MAX_COALESCED_BUFFERS = 64  # Buffers the writer gathers from the queue for one write
+MAX_SENDMSG_BUFFERS = 512  # Below IOV_MAX, the limit of buffers in one `sendmsg`
+WRITER_JOIN_TIMEOUT = 1.0  # seconds
+READER_JOIN_TIMEOUT = 1.0  # seconds
+RECV_SIZE = 64 * 1024  # Read buffer size of the client connection
+SOCKET_BUFFER_SIZE = 1024 * 1024  # Kernel send/receive buffer size of the client socket
+MAX_HEADER_LINE_SIZE = 4096  # Longer header lines are read in pieces and ignored
+
+# Spellings of the header checked before falling back to the case-insensitive pattern
+CONTENT_LENGTH_PREFIXES = (b"Content-Length:", b"content-length:")
+CONTENT_LENGTH_PREFIX_SIZE = len(CONTENT_LENGTH_PREFIXES[0])
+CONTENT_LENGTH_PATTERN = re.compile(rb"^content-length:[ \t]*(\d+)", re.IGNORECASE | re.MULTILINE)
+
+logger = logging.getLogger(__name__)
 
 
 class DAPServer:
@@ -36,7 +55,13 @@ class DAPServer:
         self.notifier = NullNotifier()
         self._temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
         self._socket_path = str(Path(self._temp_dir.name) / "dap_socket")
-        self._buffer = b""
+        self._rfile: io.BufferedReader | None = None
+        self._outbound: queue.SimpleQueue[list[bytes] | None] = queue.SimpleQueue()
+        self._writer_thread: threading.Thread | None = None
+        self._inbound: queue.SimpleQueue[dict | None] = queue.SimpleQueue()
+        self._reader_thread: threading.Thread | None = None
+        self._pending: list[bytes] = []
+        self._batch_thread_id: int | None = None
         atexit.register(self.stop)
 
     @property
@@ -52,45 +77,156 @@ class DAPServer:
         print(f"SOCKET_PATH={self._socket_path}", flush=True)
 
         self.client_conn = self._server_socket.accept()[0]
+        # Large buffers let big responses (stack traces, variables) go out in few writes.
+        self.client_conn.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCKET_BUFFER_SIZE)
+        self.client_conn.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_BUFFER_SIZE)
+        self._rfile = self.client_conn.makefile("rb", buffering=RECV_SIZE)
         print("Client connected via Unix socket")
 
+        self._writer_thread = threading.Thread(
+            target=self._writer_loop,
+            name="dap-writer",
+            daemon=True,
+        )
+        self._writer_thread.start()
         self.notifier = DAPNotifier(self)
         self._request_handler.notifier = self.notifier
 
+        self._reader_thread = threading.Thread(
+            target=self._reader_loop,
+            name="dap-reader",
+            daemon=True,
+        )
+        self._reader_thread.start()
+
     def stop(self):
         """Stop the server."""
+        if self._writer_thread:
+            # Let the writer send the messages queued so far.
+            self._outbound.put(None)
+            self._writer_thread.join(WRITER_JOIN_TIMEOUT)
+            self._writer_thread = None
         if self._server_socket:
             self._server_socket.close()
-            print("Server stopped.")  # TODO: change print to logging for filtering
+            logger.info("Server stopped.")
+        if self.client_conn:
+            # Shutdown wakes up the reader thread blocked in `recv`.
+            with contextlib.suppress(OSError):
+                self.client_conn.shutdown(socket.SHUT_RDWR)
+        if self._reader_thread:
+            self._reader_thread.join(READER_JOIN_TIMEOUT)
+            self._reader_thread = None
+        if self._rfile:
+            self._rfile.close()
         if self.client_conn:
             self.client_conn.close()
         self._temp_dir.cleanup()
 
     def handle_requests(self):
-        """Process client requests and send responses."""
+        """
+        Process client requests and send responses.
+
+        Requests are read and parsed by the reader thread, so the next request is already
+        waiting while the current one is handled. Requests are still handled one at a time,
+        in the order they were received.
+        """
         while True:
-            request = self._receive_request()
+            request = self._inbound.get()
             if request is None:
                 break
 
             try:
-                responses = self._request_handler.handle_request(request)
-                for response in responses:
-                    self._send_response(response)
+                with self._batch():
+                    for response in self._request_handler.handle_request(request):
+                        self._send_response(response)
             except (KeyError, ValueError, TypeError, RuntimeError) as err:
                 self._send_error_response(f"Internal error: {err}", INTERNAL_JSON_RPC_ERROR)
 
-    def _send_response(self, response: Iterator[dict] | dict):
+    def _send_response(self, response: dict):
         """
         Send a JSON response to the client over a socket.
 
         :param response: JSON response or event object.
         """
-        response_str = json.dumps(response)
-        content_length = len(response_str.encode())
-        header = f"Content-Length: {content_length}\r\n\r\n"
         if self.client_conn:
-            self.client_conn.sendall((header + response_str).encode())
+            self.send_message(response)
+
+    def send_message(self, message: dict):
+        """
+        Serialize a DAP message and queue it for sending to the client.
+
+        This is the single send path for both responses and events (see `DAPNotifier`).
+
+        :param message: JSON response or event object.
+        """
+        self._send_buffers(encode_message(message))
+
+    def _send_buffers(self, buffers: list[bytes]):
+        """
+        Queue framed message buffers for sending to the client.
+
+        The buffers are written by the writer thread, which owns the client socket,
+        so the caller is never blocked by a slow client. Messages are sent in queue order.
+
+        :param buffers: Header and payload buffers of one or more messages.
+        """
+        if self._batch_thread_id == threading.get_ident():
+            self._pending += buffers
+        else:
+            self._outbound.put(buffers)
+
+    @contextlib.contextmanager
+    def _batch(self):
+        """
+        Context manager that collects the messages sent from the current thread.
+
+        The responses and events produced while a request is handled are queued together
+        on exit, so they reach the client with a single write and in the order they were sent.
+        Messages sent from other threads (e.g. events from the GDB monitor) are not delayed.
+        """
+        self._batch_thread_id = threading.get_ident()
+        try:
+            yield
+        finally:
+            self._batch_thread_id = None
+            pending, self._pending = self._pending, []
+            if pending:
+                self._outbound.put(pending)
+
+    def _writer_loop(self):
+        """Write queued messages to the client, coalescing the ones queued meanwhile."""
+        stopping = False
+        while not stopping:
+            buffers = self._outbound.get()
+            if buffers is None:
+                return
+            while len(buffers) < MAX_COALESCED_BUFFERS:
+                try:
+                    queued = self._outbound.get_nowait()
+                except queue.Empty:
+                    break
+                if queued is None:
+                    stopping = True
+                    break
+                buffers = buffers + queued
+            try:
+                _write_buffers(self.client_conn, buffers)
+            except OSError as err:
+                logger.warning("Failed to send data to the client: %s", err)
+                return
+
+    def _reader_loop(self):
+        """Read client requests and queue them for `handle_requests` until the client leaves."""
+        try:
+            while True:
+                request = self._receive_request()
+                if request is None:
+                    break
+                self._inbound.put(request)
+        except OSError as err:
+            logger.info("Stopped reading client requests: %s", err)
+        finally:
+            self._inbound.put(None)
 
     def _send_error_response(self, message: str, code: int):
         """
@@ -110,94 +246,93 @@ class DAPServer:
 
     def _receive_request(self) -> dict | None:
         """
-        Read data from the socket, accumulates it in self._buffer
-        and extracts a single complete JSON request if possible.
+        Read a single complete JSON request from the client connection.
+
+        Messages with invalid JSON are answered with an error response and skipped.
+
+        :return: The request or None if the client closed the connection.
         """
+        if not self._rfile:
+            return None
         while True:
-            # Trying to extract the full query from the current buffer
-            request, buffer = self._extract_request_from_buffer(self._buffer)
-            self._buffer = buffer
-
-            if request is not None:
-                return request
+            content_length = _read_content_length(self._rfile)
+            if content_length is None:
+                return None
 
-            # If there is no request, read new data from the socket
-            data = self._receive_data()
-            if not data:
-                # If no data is received, terminate reading.
+            request_body = self._rfile.read(content_length)
+            if len(request_body) < content_length:
+                # The connection was closed in the middle of the message.
                 return None
-            self._buffer += data
+            try:
+                return loads(request_body)
+            except ValueError as err:
+                self._send_error_response(f"Invalid JSON format: {err}", JSON_DECODE_ERROR)
 
-    def _extract_request_from_buffer(self, buffer: bytes) -> tuple[dict | None, bytes]:
-        """
-        Attempt to extract the full JSON request from the buffer.
-        Returns a tuple (request, remaining_buffer), where request is the extracted request
-        (or None if the request could not be extracted) and remaining_buffer is the remaining data.
-        """
-        http_header_end_marker = b"\r\n\r\n"
-        header_end_marker_length = len(http_header_end_marker)
-        header_end = buffer.find(http_header_end_marker)
-        if header_end == -1:
-            # The headings are not complete.
-            return None, buffer
-
-        headers = buffer[:header_end].decode()
-        content_length = _get_content_length(headers)
-        if content_length is None:
-            # Content-Length header not found
-            return None, buffer
-
-        total_length = header_end + header_end_marker_length + content_length
-        if len(buffer) < total_length:
-            # The request body has not yet been fully received.
-            return None, buffer
-
-        request_body = buffer[header_end + header_end_marker_length : total_length]
-        try:
-            request = json.loads(request_body.decode())
-        except json.JSONDecodeError as err:
-            self._send_error_response(f"Invalid JSON format: {err}", JSON_DECODE_ERROR)
-            return None, buffer[total_length:]
-        remaining_buffer = buffer[total_length:]
-        return request, remaining_buffer
-
-    def _receive_data(self) -> bytes | None:
-        """
-        Receive data from the client connection.
 
-        :return: Received data or None if no connection or no data.
-        """
-        if self.client_conn:
-            return self.client_conn.recv(1024)
-        return None
+def _read_content_length(rfile: io.BufferedReader) -> int | None:
+    """
+    Read the headers of the next message up to the blank line that ends them.
 
-    def _process_buffer(self, buffer: bytes) -> dict | None:
-        """
-        Process the buffer to extract a complete JSON request.
+    Header blocks without Content-Length are skipped. Header lines are read with a size limit,
+    so a client that never sends a line break cannot make the reader buffer without bound.
 
-        :param buffer: The data buffer.
-        :return: A parsed JSON request as a dictionary or None if the request is incomplete.
-        """
-        if b"\r\n\r\n" not in buffer:
+    :param rfile: Buffered reader of the client connection.
+    :return: Content-Length value or None if the client closed the connection.
+    """
+    content_length = None
+    while True:
+        line = rfile.readline(MAX_HEADER_LINE_SIZE)
+        if not line:
             return None
+        if line.strip():
+            header_length = _get_content_length(line)
+            if header_length is not None:
+                content_length = header_length
+        elif content_length is not None:
+            return content_length
 
-        headers, _, body = buffer.partition(b"\r\n\r\n")
-        content_length = _get_content_length(headers.decode())
-        if content_length is not None and len(body) >= content_length:
-            request_body = body[:content_length]
-            return json.loads(request_body.decode())
 
-        return None
-
-
-def _get_content_length(headers: str) -> int | None:
+def _get_content_length(headers: bytes | bytearray) -> int | None:
     """
     Retrieve the Content-Length value from the headers.
 
-    :param headers: Request headers as a string.
+    The usual spellings of a header line are parsed without a regex search.
+
+    :param headers: Raw request headers.
     :return: Content-Length value or None if there is no header.
     """
-    for header in headers.split("\r\n"):
-        if header.lower().startswith("content-length:"):
-            return int(header.split(":")[1].strip())
+    if headers.startswith(CONTENT_LENGTH_PREFIXES):
+        value = headers[CONTENT_LENGTH_PREFIX_SIZE:].strip()
+        if value.isdigit():
+            return int(value)
+    match = CONTENT_LENGTH_PATTERN.search(headers)
+    if match:
+        return int(match.group(1))
     return None
+
+
+def _write_buffers(conn: socket.socket, buffers: list[bytes]):
+    """
+    Send several buffers to the socket with a single gather write.
+
+    `sendmsg` passes the buffers to the kernel as an iovec, so the header and the payload
+    are not concatenated in userspace. After a partial write the remaining buffers are
+    resent as zero-copy `memoryview` slices. Platforms without `sendmsg` fall back to `sendall`.
+
+    :param conn: Connected client socket.
+    :param buffers: Buffers to send, in order.
+    """
+    if not hasattr(conn, "sendmsg"):
+        conn.sendall(b"".join(buffers))
+        return
+
+    pending = [memoryview(buffer) for buffer in buffers]
+    start = 0
+    while start < len(pending):
+        sent = conn.sendmsg(pending[start : start + MAX_SENDMSG_BUFFERS])
+        # Skip the buffers written completely and cut off the written part of the next one.
+        while start < len(pending) and sent >= len(pending[start]):
+            sent -= len(pending[start])
+            start += 1
+        if sent:
+            pending[start] = pending[start][sent:]
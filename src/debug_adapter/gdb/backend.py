@@ -1,5 +1,7 @@
 """GDBBackend module: Manage debugging through GDB using Debug Adapter Protocol (DAP)."""
 
+import itertools
+import logging
 import threading
 import time
 from queue import Empty, Queue
@@ -18,6 +20,21 @@ from debug_adapter.gdb.threads import ThreadManager
 from debug_adapter.gdb.variables import VariableManager
 
 DEFAULT_TIMEOUT_WAITING_RESPONSE_FROM_GDB = 20.0
+# Commands that only query GDB and do not change the state of inferiors or threads
+READ_ONLY_COMMANDS = frozenset(
+    (
+        "-list-thread-groups",
+        "-thread-info",
+        "-stack-list-variables --all-values",
+        "-data-list-register-names",
+    ),
+)
+# Notifications after which source line tables may have changed
+SYMBOLS_CHANGED_NOTIFICATIONS = frozenset(("library-loaded", "library-unloaded"))
+# Notifications after which breakpoints set through the adapter may be gone or changed
+BREAKPOINTS_CHANGED_NOTIFICATIONS = frozenset(("breakpoint-deleted", "breakpoint-modified"))
+
+logger = logging.getLogger(__name__)
 
 
 class GDBBackend:
@@ -36,6 +53,11 @@ class GDBBackend:
         self._monitor_thread: threading.Thread | None = None
         self._notifier: DAPNotifier = NullNotifier()
         self._response_queue: Queue[dict[str, Any]] = Queue()
+        # Bumped from both the GDB event thread and the request thread: `next` on a counter
+        # is atomic, and every version is used once, so no change can go unnoticed
+        self._state_versions = itertools.count(1)
+        self._state_version = 0
+        self._tokens = itertools.count(1)
 
         self.breakpoint_manager = BreakpointManager(self)
         self.stack_trace_manager = StackTraceManager(self)
@@ -46,6 +68,9 @@ class GDBBackend:
 
     def start(self):
         """Start GDB and performs basic setup."""
+        # A new GDB has neither the breakpoints nor the symbols of a previous one
+        self.breakpoint_manager.invalidate_breakpoint_cache()
+        self.breakpoint_manager.invalidate_line_cache()
         self._gdbmi = GdbController(
             command=[self._gdb_path, "--nx", "--quiet", "--interpreter=mi3"],
         )
@@ -72,6 +97,16 @@ class GDBBackend:
         """Set the DAPNotifier."""
         self._notifier = value
 
+    @property
+    def state_version(self) -> int:
+        """
+        Version that changes whenever the state of GDB may have changed.
+
+        It is changed by every command that is not a known query and by every asynchronous
+        notification from GDB. Data read from GDB can be cached until the counter changes.
+        """
+        return self._state_version
+
     def _start_monitoring(self):
         """Start a thread to monitor the state of GDB."""
         self._stop_monitoring.clear()
@@ -100,7 +135,15 @@ class GDBBackend:
 
     def _process_gdb_response(self, response: dict):
         """Process individual GDB response."""
-        print(f"response: {response}", flush=True)
+        logger.debug("GDB response: %s", response)
+        if response.get("type") == "notify":
+            self._state_version = next(self._state_versions)
+            message = response.get("message")
+            if message in SYMBOLS_CHANGED_NOTIFICATIONS:
+                self.breakpoint_manager.invalidate_line_cache()
+                self.breakpoint_manager.invalidate_breakpoint_cache()
+            elif message in BREAKPOINTS_CHANGED_NOTIFICATIONS:
+                self.breakpoint_manager.invalidate_breakpoint_cache()
 
         if self._is_notify_event(response, "stopped"):
             self._handle_stop_event(response)
@@ -115,6 +158,7 @@ class GDBBackend:
 
     def _handle_stop_event(self, response: dict):
         """Handle a GDB stop and sends a `stopped` event to the DAP."""
+        self.variable_manager.invalidate_variable_cache()
         payload = response.get("payload", {})
 
         if "new-exec" in payload:
@@ -188,12 +232,79 @@ class GDBBackend:
         self._send_command(command)
         return self._read_responses_from_queue(timeout, expected_response)
 
+    def send_commands_and_get_results(
+        self,
+        commands: list[str],
+        timeout: float = DEFAULT_TIMEOUT_WAITING_RESPONSE_FROM_GDB,
+        expected_response=("done", "error", "running"),
+    ) -> list[list[dict]]:
+        """
+        Send several commands to GDB at once and wait for the responses to all of them.
+
+        The commands are written in a single write, each prefixed with its own MI token,
+        so GDB executes them back to back without a round trip per command. Use it only
+        for commands that do not depend on each other's results.
+
+        :param commands: GDB/MI commands to send, in execution order.
+        :param timeout: Maximum time (in seconds) to wait for the response of each command,
+            counted from the completion of the previous one.
+        :param expected_response: Result messages that complete a command.
+        :return: Responses of each command, in the order of `commands`.
+        """
+        if not self._gdbmi:
+            raise RuntimeError("GDB is not running")
+
+        tokens = [next(self._tokens) for _ in commands]
+        index_by_token: dict[int | None, int] = {token: index for index, token in enumerate(tokens)}
+        responses: list[list[dict]] = [[] for _ in commands]
+        completed = [False] * len(commands)
+        current = 0
+
+        self._clear_response_queue()
+        self._send_commands(commands, tokens)
+        start_time = time.time()
+        while current < len(commands) and time.time() - start_time <= timeout:
+            try:
+                response = self._response_queue.get(timeout=0.1)
+            except Empty:
+                continue
+
+            # Output records carry no token and belong to the command being executed.
+            index = index_by_token.get(response.get("token"), current)
+            responses[index].append(response)
+            if self._has_response_of_interest(response, expected_response):
+                completed[index] = True
+                if index == current:
+                    while current < len(commands) and completed[current]:
+                        current += 1
+                    start_time = time.time()
+
+        for index in range(current, len(commands)):
+            if not completed[index]:
+                responses[index].extend(self._handle_timeout_error(timeout))
+        return responses
+
     def _send_command(self, command: str) -> None:
-        print(f"Sending command to gdb: {command}", flush=True)
+        self._send_commands([command])
+
+    def _send_commands(self, commands: list[str], tokens: list[int] | None = None) -> None:
+        """
+        Write commands to GDB in a single write.
+
+        :param commands: GDB/MI commands to send.
+        :param tokens: MI tokens to prefix the commands with (default: no tokens).
+        """
+        logger.debug("Sending commands to gdb: %s", commands)
         if not self._gdbmi:
             raise RuntimeError("GDB is not running")
+        if not READ_ONLY_COMMANDS.issuperset(commands):
+            self._state_version = next(self._state_versions)
+        if tokens:
+            commands = [
+                f"{token}{command}" for token, command in zip(tokens, commands, strict=True)
+            ]
         with self._gdb_lock:
-            self._gdbmi.write(command, read_response=False)
+            self._gdbmi.write(commands, read_response=False)
 
     def _read_responses_from_queue(
         self,
@@ -301,6 +412,24 @@ class GDBBackend:
         success = True
         return CommandResult(success, "")
 
+    def send_commands_and_check_for_success(
+        self,
+        commands: list[tuple[str, bool]],
+    ) -> list[CommandResult]:
+        """
+        Send several commands to GDB at once and check which of them succeeded.
+
+        :param commands: Pairs (command, ignore_failures), in execution order.
+        :return: Result of each command, in the order of `commands`.
+        """
+        results = self.send_commands_and_get_results([command for command, _ in commands])
+        return [
+            CommandResult(success=True, message="")
+            if ignore_failures
+            else is_gdb_responses_successful_with_message(responses)
+            for (_, ignore_failures), responses in zip(commands, results, strict=True)
+        ]
+
     def select_frame(self, frame_id: str) -> CommandResult:
         """Select a specific stack frame in the debugging session."""
         return self.send_command_and_check_for_success(f"-stack-select-frame {frame_id}")
@@ -312,7 +441,7 @@ class GDBBackend:
         self.send_command_and_get_result("-enable-pretty-printing")
         self.send_command_and_get_result("set pagination off")
         self.send_command_and_get_result("set auto-solib-add on")
-        print("GDB initialized and configured.", flush=True)
+        logger.info("GDB initialized and configured.")
 
     # TODO: Make it user configurable
     def send_shared_gdb_gdbserver_settings(self):
@@ -327,4 +456,5 @@ class GDBBackend:
         # In local GDB this may not work due to limitations of ptrace().
         # but the command is harmless, we simply ignore it if there is no effect.
         self.send_command_and_get_result("set scheduler-locking off")
+        self.execution_manager.forget_scheduler_locking()
         self.send_command_and_get_result("set schedule-multiple on")
@@ -6,13 +6,18 @@ This module provides functions to set, clear, and retrieve breakpoint locations
 
 from __future__ import annotations
 
+from array import array
+from bisect import bisect_left, bisect_right
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
     from debug_adapter.common import CommandResult
     from debug_adapter.gdb.backend import GDBBackend
 
-from debug_adapter.gdb.gdb_utils import is_gdb_responses_successful_with_message
+from debug_adapter.gdb.gdb_utils import (
+    find_success_response,
+    is_gdb_responses_successful_with_message,
+)
 
 
 class BreakpointManager:
@@ -30,6 +35,10 @@ class BreakpointManager:
         :param backend: An instance of GDBBackend for executing GDB commands.
         """
         self.backend: GDBBackend = backend
+        # Breakpoints last set in each source and the result reported for them
+        self._by_source: dict[str, tuple[tuple, list[dict]]] = {}
+        # Sorted lines with code of each source, from `-symbol-list-lines`
+        self._lines_cache: dict[str, array[int]] = {}
 
     def get_breakpoint_locations(
         self,
@@ -40,89 +49,86 @@ class BreakpointManager:
         """
         Get possible lines for setting a breakpoint in a file.
 
+        The line table of a file is queried once and cached until symbols are reloaded
+        (see `invalidate_line_cache`).
+
         :param source_path: Path to the source file.
         :param line: The specific line to check for breakpoints.
         :param end_line: Optional end line for a range of breakpoints.
         :return: A tuple (success, message, list of possible breakpoint locations).
         """
-        responses = self.backend.send_command_and_get_result(f"-symbol-list-lines {source_path}")
+        lines = self._lines_cache.get(source_path)
+        if lines is None:
+            responses = self.backend.send_command_and_get_result(
+                f"-symbol-list-lines {source_path}",
+            )
 
-        success, message = is_gdb_responses_successful_with_message(responses)
-        if not success:
-            return False, message, []
+            success, message = is_gdb_responses_successful_with_message(responses)
+            if not success:
+                return False, message, []
 
-        possible_lines = self._extract_possible_lines(responses, line, end_line)
-        return True, "", [{"line": line} for line in sorted(possible_lines)]
+            lines = self._extract_lines(responses)
+            self._lines_cache[source_path] = lines
 
-    def _extract_possible_lines(
-        self,
-        responses: list[dict],
-        line: int,
-        end_line: int | None,
-    ) -> set:
+        start = bisect_left(lines, line)
+        end = bisect_right(lines, line if end_line is None else end_line, start)
+        return True, "", [{"line": lines[index]} for index in range(start, end)]
+
+    def invalidate_breakpoint_cache(self):
         """
-        Extract possible breakpoint lines from GDB responses.
+        Forget the breakpoints last set in each source, e.g. after GDB deleted or changed some.
 
-        :param responses: GDB response list.
-        :param line: Target line.
-        :param end_line: Optional end line for range.
-        :return: Set of possible line numbers.
+        The next `update_source_breakpoints` call for a source then sets its breakpoints again.
         """
-        possible_lines = set()
-        for response in responses:
-            if response.get("type") == "result" and response.get("message") == "done":
-                lines_info = response.get("payload", {}).get("lines", [])
-                possible_lines.update(self._filter_lines(lines_info, line, end_line))
-        return possible_lines
+        self._by_source.clear()
 
-    def _filter_lines(self, lines_info: list[dict], line: int, end_line: int | None) -> set:
+    def invalidate_line_cache(self, source_path: str | None = None):
         """
-        Filter lines based on given constraints.
+        Forget the cached line tables, e.g. after symbols were loaded.
 
-        :param lines_info: List of lines from GDB.
-        :param line: Target line.
-        :param end_line: Optional end line for range.
-        :return: Set of filtered line numbers.
+        :param source_path: Source file to forget the line table of (default: all files).
         """
-        return {
-            int(entry["line"]) for entry in lines_info if self._is_valid_line(entry, line, end_line)
-        }
+        if source_path is None:
+            self._lines_cache.clear()
+        else:
+            self._lines_cache.pop(source_path, None)
 
-    def _is_valid_line(self, entry: dict, line: int, end_line: int | None) -> bool:
+    def _extract_lines(self, responses: list[dict]) -> array[int]:
         """
-        Check if a line entry is valid for breakpoints.
+        Extract the lines of the line table from GDB responses.
 
-        :param entry: Line entry from GDB.
-        :param line: Target line.
-        :param end_line: Optional end line for range.
-        :return: True if valid, False otherwise.
+        :param responses: GDB response list.
+        :return: Sorted unique line numbers that have code.
         """
-        this_line = int(entry["line"])
-        return (end_line is None and this_line == line) or (
-            end_line is not None and line <= this_line <= end_line
-        )
+        result = find_success_response(responses)
+        lines_info = result.get("payload", {}).get("lines", []) if result else []
+        return array("i", sorted({int(entry["line"]) for entry in lines_info}))
 
     def set_breakpoints(
         self,
         source_path: str,
         breakpoints: list[dict],
     ) -> tuple[bool, str, list[dict]]:
-        """Set breakpoints in GDB for the specified file."""
-        responses = []
-        result_breakpoints = []
+        """
+        Set breakpoints in GDB for the specified file.
 
-        for bp in breakpoints:
-            line = bp.get("line")
-            if line is None:
-                continue
+        The `-break-insert` commands are sent to GDB together.
 
-            response = self.backend.send_command_and_get_result(
-                f"-break-insert {source_path}:{line}",
-            )
-            responses.extend(response)
+        :param source_path: Path to the source file.
+        :param breakpoints: DAP source breakpoints.
+        :return: A tuple (success, message, list of breakpoints set).
+        """
+        lines = [bp["line"] for bp in breakpoints if bp.get("line") is not None]
+        if not lines:
+            return True, "", []
 
-            success, message = is_gdb_responses_successful_with_message(response)
+        all_responses = self.backend.send_commands_and_get_results(
+            [f"-break-insert {source_path}:{line}" for line in lines],
+        )
 
+        result_breakpoints = []
+        for line, responses in zip(lines, all_responses, strict=True):
+            success, message = is_gdb_responses_successful_with_message(responses)
             result_breakpoints.append(
                 {
                     "verified": success,
@@ -134,6 +140,50 @@ class BreakpointManager:
 
         return True, "", result_breakpoints
 
+    def update_source_breakpoints(
+        self,
+        source_path: str,
+        breakpoints: list[dict],
+    ) -> tuple[bool, str, list[dict]]:
+        """
+        Replace the breakpoints of a source file with the given ones.
+
+        Clients resend the breakpoints of a file e.g. whenever it gets focus. If they match
+        the breakpoints last set in the file and all of them were verified, GDB is not queried
+        and a copy of the previous result is returned, until the breakpoints in GDB may have
+        changed (see `invalidate_breakpoint_cache`).
+
+        :param source_path: Path to the source file.
+        :param breakpoints: DAP source breakpoints.
+        :return: A tuple (success, message, list of breakpoints set).
+        """
+        incoming = tuple(
+            (
+                bp.get("line"),
+                bp.get("column"),
+                bp.get("condition"),
+                bp.get("hitCondition"),
+                bp.get("logMessage"),
+            )
+            for bp in breakpoints
+        )
+        cached = self._by_source.get(source_path)
+        if cached is not None and cached[0] == incoming:
+            return True, "", _copy_breakpoints(cached[1])
+
+        self._by_source.pop(source_path, None)
+        self.clear_breakpoints(source_path)
+
+        result_breakpoints: list[dict] = []
+        message = ""
+        success = True
+        if breakpoints:
+            success, message, result_breakpoints = self.set_breakpoints(source_path, breakpoints)
+
+        if success and all(bp["verified"] for bp in result_breakpoints):
+            self._by_source[source_path] = (incoming, _copy_breakpoints(result_breakpoints))
+        return success, message, result_breakpoints
+
     def set_breakpoint_on_main(self) -> CommandResult:
         """Set breakpoint in GDB on main function."""
         return self.backend.send_command_and_check_for_success(
@@ -155,7 +205,12 @@ class BreakpointManager:
         """
         Set a catchpoint in GDB to pause execution when the program
         performs an exec() system call.
+
+        The exec'd program brings its own symbols, so cached line tables and breakpoints
+        are dropped.
         """
+        self.invalidate_line_cache()
+        self.invalidate_breakpoint_cache()
         self.backend.send_command_and_get_result("catch exec")
 
     def _get_breakpoints_from_response(self, responses: list[dict], source_path: str) -> list[str]:
@@ -166,26 +221,27 @@ class BreakpointManager:
         :param source_path: Path to the source file.
         :return: List of breakpoint numbers to delete.
         """
-        for response in responses:
-            if response.get("type") != "result" or response.get("message") != "done":
-                continue  # Skip invalid answers
+        result = find_success_response(responses)
+        if result is None:
+            return []
 
-            breakpoint_table = response.get("payload", {}).get("BreakpointTable", {})
-            breakpoints = breakpoint_table.get("body", [])
-
-            return [
-                bp.get("number")
-                for bp in breakpoints
-                if bp.get("fullname") == source_path and bp.get("number")
-            ]
-
-        return []
+        breakpoint_table = result.get("payload", {}).get("BreakpointTable", {})
+        return [
+            bp.get("number")
+            for bp in breakpoint_table.get("body", [])
+            if bp.get("fullname") == source_path and bp.get("number")
+        ]
 
     def _delete_breakpoints(self, breakpoints: list[str]):
         """
-        Delete breakpoints by their numbers.
+        Delete breakpoints by their numbers with a single command.
 
         :param breakpoints: List of breakpoint numbers.
         """
-        for bp_number in breakpoints:
-            self.backend.send_command_and_get_result(f"-break-delete {bp_number}")
+        if breakpoints:
+            self.backend.send_command_and_get_result(f"-break-delete {' '.join(breakpoints)}")
+
+
+def _copy_breakpoints(breakpoints: list[dict]) -> list[dict]:
+    """Copy DAP breakpoints, so cached results are not changed through returned ones."""
+    return [{**bp, "source": dict(bp["source"])} for bp in breakpoints]
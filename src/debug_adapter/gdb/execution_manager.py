@@ -32,71 +32,57 @@ class ExecutionManager:
         :param backend: An instance of GDBBackend for executing GDB commands.
         """
         self.backend = backend
+        # Last `scheduler-locking` mode set by step-out, None if unknown
+        self._scheduler_locking: str | None = None
 
     def execute_step_out(self, thread_id: int | None, single_thread: bool) -> CommandResult:
         """
-        Execute the `finish` command in GDB after switching to the specified thread.
+        Execute the `-exec-finish` command in GDB in the specified thread.
 
-        :param thread_id: The ID of the thread to switch to before stepping out.
+        :param thread_id: The ID of the thread to step out in.
         :param single_thread: Whether to step out only in a single thread.
         :return: A tuple (success, message) indicating whether the command executed successfully.
         """
-        if thread_id:
-            success, message = self.backend.send_command_and_check_for_success(
-                f"-thread-select {thread_id}",
-            )
-            if not success:
-                return CommandResult(success, f"Failed to select thread {thread_id}: {message}")
-
         scheduler_mode = "on" if single_thread else "off"
-        self.backend.send_command_and_get_result(f"set scheduler-locking {scheduler_mode}")
+        if scheduler_mode != self._scheduler_locking:
+            self.backend.send_command_and_get_result(f"set scheduler-locking {scheduler_mode}")
+            self._scheduler_locking = scheduler_mode
 
-        return self.backend.send_command_and_check_for_success("finish &")
+        return self.backend.send_command_and_check_for_success(
+            _in_thread("-exec-finish", thread_id),
+        )
 
     def execute_step_in(self, thread_id: int | None) -> CommandResult:
         """
-        Execute the `-exec-step` command in GDB after switching to the specified thread.
+        Execute the `-exec-step` command in GDB in the specified thread.
 
-        :param thread_id: The ID of the thread to switch to before stepping in.
+        :param thread_id: The ID of the thread to step in.
         :return: A tuple (success, message) indicating whether the command executed successfully.
         """
-        if thread_id:
-            success, message = self.backend.send_command_and_check_for_success(
-                f"-thread-select {thread_id}",
-            )
-            if not success:
-                return CommandResult(success, f"Failed to select thread {thread_id}: {message}")
-
-        return self.backend.send_command_and_check_for_success("-exec-step")
+        return self.backend.send_command_and_check_for_success(_in_thread("-exec-step", thread_id))
 
     def execute_next(self, thread_id: int | None) -> CommandResult:
         """
-        Execute the `-exec-next` command in GDB after switching to the specified thread.
+        Execute the `-exec-next` command in GDB in the specified thread.
 
-        :param thread_id: The ID of the thread to switch to before stepping.
+        :param thread_id: The ID of the thread to step.
         :return: A tuple (success, message) indicating whether the command executed successfully.
         """
-        if thread_id:
-            success, message = self.backend.send_command_and_check_for_success(
-                f"-thread-select {thread_id}",
-            )
-            if not success:
-                return CommandResult(success, f"Failed to select thread {thread_id}: {message}")
-
-        return self.backend.send_command_and_check_for_success("-exec-next")
+        return self.backend.send_command_and_check_for_success(_in_thread("-exec-next", thread_id))
 
     def pause_execution(self, thread_id: int | None = None) -> CommandResult:
         """Pause program execution."""
-        if thread_id:
-            self.backend.send_command_and_get_result(f"-thread-select {thread_id}")
-        responses = self.backend.send_command_and_get_result("-exec-interrupt")
+        responses = self.backend.send_command_and_get_result(
+            _in_thread("-exec-interrupt", thread_id),
+        )
 
         return is_gdb_responses_successful_with_message(responses)
 
     def continue_execution(self, thread_id: int | None = None) -> CommandResult:
         """Continue program execution."""
-        command = f"-exec-continue --thread {thread_id}" if thread_id else "-exec-continue"
-        responses = self.backend.send_command_and_get_result(command)
+        responses = self.backend.send_command_and_get_result(
+            _in_thread("-exec-continue", thread_id),
+        )
         return is_gdb_responses_successful_with_message(responses)
 
     def load_executable_and_symbols(self, program_path: str) -> CommandResult:
@@ -107,8 +93,15 @@ class ExecutionManager:
                 message=f"The path {program_path} does not exist",
             )
         self.backend.send_command_and_get_result(f"-file-exec-and-symbols {program_path}")
+        self.backend.breakpoint_manager.invalidate_line_cache()
+        self.backend.breakpoint_manager.invalidate_breakpoint_cache()
+        self.forget_scheduler_locking()
         return CommandResult(success=True, message="")
 
+    def forget_scheduler_locking(self):
+        """Make the next step-out set `scheduler-locking` again, e.g. after it was changed."""
+        self._scheduler_locking = None
+
     def set_program_arguments(self, arg_string: str):
         """Set the command-line arguments for the program being debugged in GDB."""
         self.backend.send_command_and_get_result(f"-exec-arguments {arg_string}")
@@ -116,3 +109,17 @@ class ExecutionManager:
     def exec_run(self):
         """Start execution of the debugged program in GDB."""
         self.backend.send_command_and_get_result("-exec-run")
+
+
+def _in_thread(command: str, thread_id: int | None) -> str:
+    """
+    Make an MI command run in the given thread.
+
+    The `--thread` option selects the thread as part of the command itself,
+    so no separate `-thread-select` round trip is needed.
+
+    :param command: GDB/MI command.
+    :param thread_id: The ID of the thread, or None for the selected thread.
+    :return: The command with the `--thread` option if a thread is given.
+    """
+    return f"{command} --thread {thread_id}" if thread_id else command
@@ -28,3 +28,15 @@ def is_success_response(resp: dict) -> bool:
              False otherwise
     """
     return resp.get("type") == "result" and resp.get("message") == "done"
+
+
+def find_success_response(responses: list[dict]) -> dict | None:
+    """
+    Find the successful result record among GDB responses.
+
+    The result record ends the output of a command, so the responses are scanned from the end.
+
+    :param responses: List of responses from GDB.
+    :return: The `^done` result record or None if there is none.
+    """
+    return next((resp for resp in reversed(responses) if is_success_response(resp)), None)
@@ -7,16 +7,22 @@ list processes, and select inferiors by PID.
 
 from __future__ import annotations
 
+import logging
 import re
 from pathlib import Path
 from typing import TYPE_CHECKING
 
 from debug_adapter.common import CommandResult
-from debug_adapter.gdb.gdb_utils import is_gdb_responses_successful_with_message
+from debug_adapter.gdb.gdb_utils import (
+    find_success_response,
+    is_gdb_responses_successful_with_message,
+)
 
 if TYPE_CHECKING:
     from debug_adapter.gdb.backend import GDBBackend
 
+logger = logging.getLogger(__name__)
+
 
 class ProcessManager:
     """
@@ -37,6 +43,9 @@ class ProcessManager:
         :param backend: An instance of GDBBackend for executing GDB commands.
         """
         self.backend = backend
+        # (backend state version, value) of the last thread groups and current PID queries
+        self._thread_groups_cache: tuple[int, list[dict]] | None = None
+        self._current_pid_cache: tuple[int, int | None] | None = None
 
     def attach_to_process(self, pid: int, program_path: str = "") -> CommandResult:
         """
@@ -99,10 +108,9 @@ class ProcessManager:
 
     def parse_processes(self, result: list[dict]) -> list[dict]:
         """Extract a list of processes from the output of a GDB command."""
-        if not result:
-            return []
-        first_result = result[0]
-        os_data = first_result.get("payload", {}).get("OSDataTable")
+        success_response = find_success_response(result)
+        payload = success_response.get("payload") if success_response else None
+        os_data = payload.get("OSDataTable") if payload else None
         if not os_data:
             return []
 
@@ -139,9 +147,26 @@ class ProcessManager:
         return None
 
     def get_current_pid(self) -> int | None:
-        """Get the PID of the current (active) process."""
+        """
+        Get the PID of the current (active) process.
+
+        The result is cached until the state of GDB changes (see `GDBBackend.state_version`).
+        """
+        state_version = self.backend.state_version
+        if self._current_pid_cache and self._current_pid_cache[0] == state_version:
+            return self._current_pid_cache[1]
+
+        current_pid = self._query_current_pid()
+        self._current_pid_cache = (state_version, current_pid)
+        return current_pid
+
+    def _query_current_pid(self) -> int | None:
         command = "-thread-info"
         result = self.backend.send_command_and_get_result(command)
+        return self._parse_current_pid(result)
+
+    def _parse_current_pid(self, result: list[dict]) -> int | None:
+        """Extract the PID of the current process from the output of `-thread-info`."""
         if not result:
             return None
 
@@ -164,12 +189,12 @@ class ProcessManager:
     def add_inferior_with_pids(self, pids: list[int]) -> None:
         """Add inferiors for all passed PIDs, attach processes and return the initial inferior."""
         if not pids:
-            print("No PIDs provided", flush=True)
+            logger.warning("No PIDs provided")
             return
 
         current_inferior = self.get_current_inferior()
         if not current_inferior:
-            print("Failed to determine current inferior", flush=True)
+            logger.warning("Failed to determine current inferior")
             return
 
         new_inferiors = self._create_inferiors_for_pids(pids)
@@ -186,7 +211,7 @@ class ProcessManager:
             if new_inferior:
                 new_inferiors[pid] = new_inferior
             else:
-                print(f"Failed to create inferior for PID {pid}", flush=True)
+                logger.warning("Failed to create inferior for PID %s", pid)
         return new_inferiors
 
     def _attach_pids_to_inferiors(self, pid_inferior_map: dict[int, int]) -> None:
@@ -223,6 +248,16 @@ class ProcessManager:
         self._remove_inferiors(pid_to_inferior)
 
     def _get_thread_groups(self) -> list[dict]:
+        """Get the thread groups (inferiors), cached until the state of GDB changes."""
+        state_version = self.backend.state_version
+        if self._thread_groups_cache and self._thread_groups_cache[0] == state_version:
+            return self._thread_groups_cache[1]
+
+        groups = self._query_thread_groups()
+        self._thread_groups_cache = (state_version, groups)
+        return groups
+
+    def _query_thread_groups(self) -> list[dict]:
         responses = self.backend.send_command_and_get_result("-list-thread-groups")
         if not responses:
             return []
@@ -309,7 +344,7 @@ class ProcessManager:
                 break
 
         if not target_inferior:
-            print(f"No inferior found for PID {pid}", flush=True)
+            logger.warning("No inferior found for PID %s", pid)
             return False
 
         if target_inferior.startswith("i"):
@@ -344,8 +379,45 @@ class ProcessManager:
                 )
             command = f"file {program_path}"
             self.backend.send_command_and_get_result(command)
+            self.backend.breakpoint_manager.invalidate_line_cache()
+            self.backend.breakpoint_manager.invalidate_breakpoint_cache()
         return CommandResult(success=True, message="")
 
+    def prepare_new_process(
+        self,
+        program_path: str,
+    ) -> tuple[CommandResult, list[dict], int | None]:
+        """
+        Load the symbols of a new process, break at its `main` and collect the process info.
+
+        The GDB commands do not depend on each other, so they are sent as one pipelined batch.
+
+        :param program_path: Path to the program of the new process (may be empty).
+        :return: Result, list of OS processes and PID of the current process.
+        """
+        if program_path and not Path(program_path).exists():
+            result = CommandResult(
+                success=False,
+                message=f"The path {program_path} does not exist",
+            )
+            return result, [], self.get_current_pid()
+
+        commands = ["-break-insert main", "-info-os processes", "-thread-info"]
+        if program_path:
+            commands.insert(0, f"file {program_path}")
+            self.backend.breakpoint_manager.invalidate_line_cache()
+            self.backend.breakpoint_manager.invalidate_breakpoint_cache()
+        *_, break_responses, processes_responses, thread_info_responses = (
+            self.backend.send_commands_and_get_results(commands)
+        )
+
+        processes: list[dict] = []
+        result = is_gdb_responses_successful_with_message(break_responses)
+        if result.success:
+            result = is_gdb_responses_successful_with_message(processes_responses)
+            processes = self.parse_processes(processes_responses)
+        return result, processes, self._parse_current_pid(thread_info_responses)
+
     def _find_target_inferior_and_groups(
         self,
         responses: list[dict],
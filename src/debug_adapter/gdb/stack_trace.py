@@ -28,6 +28,7 @@ class StackTraceManager:
         :param backend: An instance of GDBBackend for executing GDB commands.
         """
         self.backend: GDBBackend = backend
+        self._thread_id: int | None = None  # Thread whose frames were listed last
 
     def get_stack_trace(self, thread_id: int) -> tuple[bool, str, list[dict]]:
         """
@@ -36,6 +37,10 @@ class StackTraceManager:
         :param thread_id: ID of the thread to fetch the stack trace for.
         :return: A tuple containing success status, message, and stack frames.
         """
+        if thread_id != self._thread_id:
+            # Frame IDs are frame levels, so they refer to frames of the last listed thread
+            self.backend.variable_manager.forget_local_variables()
+            self._thread_id = thread_id
         self.backend.send_command_and_get_result(f"-thread-select {thread_id}")
         responses = self.backend.send_command_and_get_result("-stack-list-frames")
 
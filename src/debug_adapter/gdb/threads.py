@@ -11,7 +11,13 @@ from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from debug_adapter.gdb.backend import GDBBackend
 
-from debug_adapter.gdb.gdb_utils import is_gdb_responses_successful_with_message
+from debug_adapter.gdb.gdb_utils import (
+    find_success_response,
+    is_gdb_responses_successful_with_message,
+)
+
+# Fields of a `-thread-info` thread passed on to the client, defaulting to the thread name
+THREAD_KEYS = ("target-id", "name", "frame", "details", "state", "core")
 
 
 class ThreadManager:
@@ -44,27 +50,19 @@ class ThreadManager:
 
     def _extract_threads(self, responses: list[dict]) -> list[dict]:
         """Extract thread information from GDB responses."""
-        if not responses:
-            return []
-        for resp in responses:
-            payload = resp.get("payload", {})
-            if not isinstance(payload, dict):
-                return []
-            return self._parse_threads(payload.get("threads", []))
-        return []
+        result = find_success_response(responses)
+        # pygdbmi gives result records a dict payload, or None when they carry no results
+        payload = result.get("payload") if result else None
+        return self._parse_threads(payload.get("threads", [])) if payload else []
 
     def _parse_threads(self, threads: list[dict]) -> list[dict]:
         """Parse thread details from GDB payload."""
-        if not threads:
-            return []
-        keys = ["target-id", "name", "frame", "details", "state", "core"]
-        return [
-            {
-                "id": int(thread["id"]),
-                **{key: self._get_thread_value(thread, key) for key in keys},
-            }
-            for thread in threads
-        ]
-
-    def _get_thread_value(self, thread, key, default_prefix="Thread") -> dict:
-        return thread.get(key, f"{default_prefix} {thread['id']}")
+        parsed_threads = []
+        for thread in threads:
+            thread_id = thread["id"]
+            default = f"Thread {thread_id}"
+            parsed_thread = {"id": int(thread_id)}
+            for key in THREAD_KEYS:
+                parsed_thread[key] = thread.get(key, default)
+            parsed_threads.append(parsed_thread)
+        return parsed_threads
@@ -7,16 +7,56 @@ and variable children, as well as handling GDB's variable objects.
 
 from __future__ import annotations
 
+import itertools
 import re
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, NamedTuple
 
 if TYPE_CHECKING:
     from debug_adapter.gdb.backend import GDBBackend
 
 from debug_adapter.common import VAR_REF_DYNAMIC_BASE, VAR_REF_LOCAL_BASE, VAR_REF_REGISTERS_BASE
-from debug_adapter.gdb.gdb_utils import is_success_response
+from debug_adapter.gdb.gdb_utils import find_success_response
 
 VAR_REF_NO_NESTING = 0
+HEX_POINTER_PATTERN = re.compile("0x[0-9a-fA-F]+")
+# Shown for children listed without a value (aggregates, see `--simple-values`)
+AGGREGATE_VALUE = "{...}"
+
+
+class VarObject(NamedTuple):
+    """Fields of a GDB variable object, converted once from a GDB/MI record."""
+
+    name: str
+    exp: str
+    value: str
+    type: str
+    numchild: int
+    has_more: bool
+    displayhint: str
+
+    @classmethod
+    def from_record(cls, record: dict, default_value: str = "<unknown>") -> VarObject:
+        """
+        Build a variable object from a `-var-create` payload or a `-var-list-children` child.
+
+        :param record: GDB/MI record of the variable object.
+        :param default_value: Value to use if the record has no value.
+        :return: Variable object with missing fields set to defaults.
+        """
+        return cls(
+            name=record.get("name", ""),
+            exp=record.get("exp", "<unknown>"),
+            value=record.get("value", default_value),
+            type=record.get("type", "unknown"),
+            numchild=int(record.get("numchild", "0")),
+            has_more=record.get("has_more", "0") == "1",
+            displayhint=record.get("displayhint", ""),
+        )
+
+    @property
+    def can_expand(self) -> bool:
+        """Check if the variable object has (or may have) children."""
+        return self.numchild > 0 or self.has_more or self.displayhint == "array"
 
 
 class VariableManager:
@@ -34,53 +74,130 @@ class VariableManager:
         :param backend: An instance of GDBBackend for executing GDB commands.
         """
         self.backend: GDBBackend = backend
-        self._var_map: dict = {}  # Stores the variablesReference -> GDB object relationships
-        self._var_ref_dynamic_counter: int = VAR_REF_DYNAMIC_BASE
+        # GDB variable object names, indexed by `variablesReference - VAR_REF_DYNAMIC_BASE`
+        self._var_names: list[str] = []
+        # Reference of a dereference entry -> pointer variable object, until it is expanded
+        self._deferred_derefs: dict[int, str] = {}
+        # Root variable objects (locals and dereferenced pointers) created since the last stop
+        self._root_var_objects: list[str] = []
+        # (frame id, variable name) -> local variable of the last listed thread
+        self._local_vars_cache: dict[tuple[int, str], dict] = {}
+        # Local variable objects created before the last stop, deleted with the next batch
+        self._stale_var_objects: list[str] = []
+        # Stops reported by the GDB event thread and the last one the variables were reset for
+        self._stops = itertools.count(1)
+        self._stop_epoch = 0
+        self._seen_stop_epoch = 0
+        # Query command -> (state version, payload field) of the last answer from GDB
+        self._query_cache: dict[str, tuple[int, list]] = {}
 
     def get_vars(self, var_ref: int) -> list[dict]:
         """
         Retrieve a list of variables based on `variablesReference`.
 
         :param var_ref: Reference ID for variables.
-        :return: List of variables.
+        :return: List of variables, already shaped as DAP `Variable` objects
+            (`name`, `value`, `variablesReference`).
         """
         if VAR_REF_LOCAL_BASE <= var_ref < VAR_REF_REGISTERS_BASE:
-            return self._get_local_vars()
+            return self._get_local_vars(var_ref - VAR_REF_LOCAL_BASE)
 
         if VAR_REF_REGISTERS_BASE <= var_ref < VAR_REF_DYNAMIC_BASE:
             return self.get_registers()
 
         return self.get_variable_children(var_ref)
 
-    def _get_local_vars(self) -> list[dict]:
+    def invalidate_variable_cache(self):
+        """
+        Forget the variable objects created so far, after the program stopped.
+
+        This runs on the GDB event thread, so it only records the stop: the variables
+        are reset by the request thread before its next variable query
+        (see `_reset_after_stop`).
+        """
+        self._stop_epoch = next(self._stops)
+
+    def _reset_after_stop(self):
+        """
+        Reset the variables if the program stopped since they were last used.
+
+        Variable references start over from `VAR_REF_DYNAMIC_BASE`, and the root variable
+        objects are deleted with one batch of commands the next time local variables
+        are fetched.
+        """
+        stop_epoch = self._stop_epoch
+        if stop_epoch == self._seen_stop_epoch:
+            return
+        self._seen_stop_epoch = stop_epoch
+        self._stale_var_objects.extend(self._root_var_objects)
+        self._root_var_objects = []
+        self._local_vars_cache = {}
+        self._var_names = []
+        self._deferred_derefs = {}
+
+    def forget_local_variables(self):
+        """
+        Forget the local variables listed so far, e.g. after another thread was selected.
+
+        Variable references stay valid until the program stops again. Like the variable
+        queries, this must be called on the request thread.
+        """
+        self._local_vars_cache = {}
+
+    def _get_local_vars(self, frame_id: int = 0) -> list[dict]:
         """
         Fetch and parse local variables from GDB.
 
+        Variable objects of expandable variables are created once per frame until
+        the cache is invalidated.
+
+        :param frame_id: ID of the frame the local variables belong to.
         :return: List of parsed local variables.
         """
+        self._reset_after_stop()
         local_variables = self.get_local_variables_with_values()
-        parsed_vars = []
-        for var in local_variables:
-            var_name = var["name"]
-            value = var.get("value", "<unknown>")
-            if self._is_complex_variable(value) or self._is_pointer_value(value):
-                var_ref = self.create_gdb_variable(var_name)["variablesReference"]
+        if self._stale_var_objects:
+            self._delete_stale_var_objects()
+        parsed_vars = [
+            {
+                "name": var["name"],
+                "value": var.get("value", "<unknown>"),
+                "variablesReference": VAR_REF_NO_NESTING,
+            }
+            for var in local_variables
+        ]
+
+        # Missing variable objects of expandable variables are created with one batch of commands
+        cache = self._local_vars_cache
+        missing = []
+        for parsed_var in parsed_vars:
+            if not self._is_expandable_value(parsed_var["value"]):
+                continue
+            variable = cache.get((frame_id, parsed_var["name"]))
+            if variable is None:
+                missing.append(parsed_var)
             else:
-                var_ref = VAR_REF_NO_NESTING
-            parsed_vars.append(
-                {
-                    "name": var_name,
-                    "value": value,
-                    "variablesReference": var_ref,
-                },
-            )
+                parsed_var["variablesReference"] = variable["variablesReference"]
+
+        created = self.create_gdb_variables([parsed_var["name"] for parsed_var in missing])
+        for parsed_var, variable in zip(missing, created, strict=True):
+            if variable:
+                if variable["gdb_name"]:
+                    self._root_var_objects.append(variable["gdb_name"])
+                self._local_vars_cache[frame_id, parsed_var["name"]] = variable
+                parsed_var["variablesReference"] = variable["variablesReference"]
         return parsed_vars
 
+    def _delete_stale_var_objects(self):
+        """Delete the variable objects created before the last stop with one batch of commands."""
+        stale_var_objects, self._stale_var_objects = self._stale_var_objects, []
+        self.backend.send_commands_and_get_results(
+            [f"-var-delete {gdb_name}" for gdb_name in stale_var_objects],
+        )
+
     def check_for_local_variables(self) -> bool:
         """Check if there are any local variables in the current frame."""
-        responses = self.backend.send_command_and_get_result("-stack-list-variables --all-values")
-        vars_list = self._extract_payload_field(responses, "variables")
-        return bool(vars_list)
+        return bool(self.get_local_variables_with_values())
 
     def check_for_registers(self) -> bool:
         """
@@ -88,19 +205,38 @@ class VariableManager:
 
         :return: List of variable names.
         """
-        responses = self.backend.send_command_and_get_result("-data-list-register-names")
-        register_list = self._extract_payload_field(responses, "register-names")
-        return bool(register_list)
+        return bool(self._query_payload_field("-data-list-register-names", "register-names"))
 
     def get_local_variables_with_values(self) -> list[dict]:
         """
         Fetch local variables with their values for the current frame from GDB.
 
+        The `scopes` and `variables` requests of the same stop share one answer from GDB.
+
         :return: List of dictionaries containing variable names and values.
         """
-        responses = self.backend.send_command_and_get_result("-stack-list-variables --all-values")
-        vars_list = self._extract_payload_field(responses, "variables")
-        return vars_list if vars_list else []
+        return self._query_payload_field("-stack-list-variables --all-values", "variables")
+
+    def _query_payload_field(self, command: str, field: str) -> list:
+        """
+        Send a query to GDB and return a field of its payload.
+
+        The result is cached until the state of GDB changes (see `GDBBackend.state_version`),
+        e.g. until the program stops again or another frame is selected.
+
+        :param command: GDB/MI query command (one of `READ_ONLY_COMMANDS`).
+        :param field: Name of the payload field.
+        :return: Value of the field (empty if the query failed).
+        """
+        state_version = self.backend.state_version
+        cached = self._query_cache.get(command)
+        if cached and cached[0] == state_version:
+            return cached[1]
+
+        responses = self.backend.send_command_and_get_result(command)
+        values = self._extract_payload_field(responses, field)
+        self._query_cache[command] = (state_version, values)
+        return values
 
     def get_registers(self) -> list:  # TODO
         """
@@ -109,168 +245,165 @@ class VariableManager:
         """
         return []
 
-    def create_gdb_variable(self, var_name: str) -> dict:
+    def create_gdb_variables(self, var_names: list[str]) -> list[dict]:
         """
-        Create a GDB variable object.
+        Create GDB variable objects for several variables with one batch of commands.
 
-        :param var_name: Name of the variable in GDB.
-        :return: Dictionary containing variable information.
+        :param var_names: Names of the variables in GDB.
+        :return: Variable information of each variable, in the order of `var_names`
+            (empty if the variable object could not be created). `gdb_name` is the name
+            of the variable object, to delete it with.
         """
-        hash_var_name = {hash(var_name)}
-        gdb_var_name = f"var_{hash_var_name}"
-        self.safe_var_delete(gdb_var_name)
-        cmd = f"-var-create - * {var_name}"
-        responses = self.backend.send_command_and_get_result(cmd)
-
-        return self._extract_variable_from_response(responses, var_name)
+        if not var_names:
+            return []
+        all_responses = self.backend.send_commands_and_get_results(
+            [f"-var-create - * {var_name}" for var_name in var_names],
+        )
+        return [
+            self._extract_variable_from_response(responses, var_name)
+            for var_name, responses in zip(var_names, all_responses, strict=True)
+        ]
 
     def _extract_variable_from_response(self, responses: list[dict], var_name: str) -> dict:
         payload = self._parse_gdb_response(responses)
         return self._extract_variable_from_payload(payload, var_name) if payload else {}
 
     def _parse_gdb_response(self, responses: list[dict]) -> dict | None:
-        for resp in responses:
-            if is_success_response(resp):
-                return resp.get("payload", {})
-        return None
+        result = find_success_response(responses)
+        return result.get("payload") or {} if result else None
 
     def _extract_variable_from_payload(self, payload: dict, var_name: str) -> dict:
-        numchild = int(payload.get("numchild", "0"))
-        has_more = payload.get("has_more", "0")
-        displayhint = payload.get("displayhint", "")
-
-        can_expand = numchild > 0 or has_more == "1" or displayhint == "array"
-        gdb_var_name = payload.get("name", "")
+        var_object = VarObject.from_record(payload)
 
         var_ref = VAR_REF_NO_NESTING
-        if can_expand and gdb_var_name:
-            var_ref = self._generate_new_var_dynamic_ref()
-            self._var_map[var_ref] = gdb_var_name
+        if var_object.can_expand and var_object.name:
+            var_ref = self._add_var_name(var_object.name)
 
         return {
             "name": var_name,
-            "value": payload.get("value", "<unknown>"),
-            "type": payload.get("type", "unknown"),
-            "numchild": numchild,
+            "gdb_name": var_object.name,
+            "value": var_object.value,
+            "type": var_object.type,
+            "numchild": var_object.numchild,
             "variablesReference": var_ref,
         }
 
-    def _generate_new_var_dynamic_ref(self) -> int:
-        ref = self._var_ref_dynamic_counter
-        self._var_ref_dynamic_counter += 1
-        return ref
-
-    def safe_var_delete(self, gdb_name: str):
+    def _add_var_name(self, gdb_var_name: str) -> int:
         """
-        Delete a GDB variable safely.
+        Assign a new `variablesReference` to a GDB variable.
 
-        :param gdb_name: Name of the variable in GDB.
+        :param gdb_var_name: Name of the variable object (or expression) in GDB.
+        :return: The new reference.
         """
-        cmd = f"-var-delete {gdb_name}"
-        self.backend.send_command_and_get_result(cmd)
+        self._var_names.append(gdb_var_name)
+        return VAR_REF_DYNAMIC_BASE + len(self._var_names) - 1
+
+    def _get_var_name(self, var_ref: int) -> str | None:
+        index = var_ref - VAR_REF_DYNAMIC_BASE
+        return self._var_names[index] if 0 <= index < len(self._var_names) else None
 
     def get_variable_children(self, var_ref: int) -> list[dict]:
         """
         Retrieve child variables of a given GDB variable.
 
+        Only values of simple types are rendered by GDB: aggregate children are shown
+        as `AGGREGATE_VALUE` until they are expanded, which skips their pretty-printing.
+
         :param var_ref: Reference ID of the parent variable.
         :return: List of child variables.
         """
-        gdb_var_name = self._var_map.get(var_ref)
+        self._reset_after_stop()
+        pointer_var_name = self._deferred_derefs.pop(var_ref, None)
+        if pointer_var_name:
+            self._create_deref_var_object(var_ref, pointer_var_name)
+        gdb_var_name = self._get_var_name(var_ref)
         if not gdb_var_name:
             return []
         escaped_name = escape_gdb_var_name(gdb_var_name)
-        cmd = f"-var-list-children --all-values {escaped_name}"
+        cmd = f"-var-list-children --simple-values {escaped_name}"
         responses = self.backend.send_command_and_get_result(cmd)
         return self._extract_variable_children_from_response(responses)
 
-    def _extract_variable_children_from_response(
-        self,
-        responses: list[dict],
-    ) -> list[dict]:
-        if not responses:
-            return []
-        for resp in responses:
-            if is_success_response(resp):
-                children = resp.get("payload", {}).get("children", [])
-                return self._parse_variable_children_response(children)
-        return []
-
-    def _parse_variable_children_response(
-        self,
-        children: list[dict],
-    ) -> list[dict]:
-        results = []
-        for child in children:
-            parsed = self._parse_child_variable(child)
-            if parsed:
-                results.extend(parsed)
-        return results
-
-    def _parse_child_variable(self, child: dict) -> list[dict] | None:
-        child_gdb_name = child.get("name", "")
-        if not child_gdb_name:
-            return None
-
-        entries = []
-        child_var_ref = (
-            self._generate_new_var_dynamic_ref() if self._can_expand_variable(child) else 0
-        )
-        if child_var_ref:
-            self._var_map[child_var_ref] = child_gdb_name
-
-        entries.append(
-            {
-                "name": child.get("exp", "<unknown>"),
-                "value": child.get("value", "<unknown>"),
-                "variablesReference": child_var_ref,
-            },
-        )
-
-        if self._is_pointer_type(child.get("type", ""), child.get("value", "<unknown>")):
-            self._process_pointer_variable(entries, child, child_gdb_name)
-
-        return entries
-
-    def _process_pointer_variable(self, entries: list[dict], child: dict, child_gdb_name: str):
-        deref_var_name = f"*({child_gdb_name})"
-        deref_var_ref = self._generate_new_var_dynamic_ref()
-        self._var_map[deref_var_ref] = deref_var_name
-
-        escaped_deref_name = escape_gdb_var_name(deref_var_name)
-        command = f"-var-list-children --all-values {escaped_deref_name}"
-        responses = self.backend.send_command_and_get_result(command)
-        deref_display_name = child.get("exp", "<unknown>")
+    def _extract_variable_children_from_response(self, responses: list[dict]) -> list[dict]:
+        """
+        Build the DAP variables of the children listed by `-var-list-children`.
 
-        if self._has_children(responses):
-            entries.append(
+        :param responses: GDB responses to `-var-list-children`.
+        :return: Child variables, each pointer child followed by its dereference entry.
+        """
+        payload = self._parse_gdb_response(responses)
+        parsed_children: list[dict] = []
+        for child in payload.get("children", ()) if payload else ():
+            var_object = VarObject.from_record(child, default_value=AGGREGATE_VALUE)
+            if not var_object.name:
+                continue
+            parsed_children.append(
                 {
-                    "name": f"*({deref_display_name})",
-                    "value": "",
-                    "variablesReference": deref_var_ref,
+                    "name": var_object.exp,
+                    "value": var_object.value,
+                    "variablesReference": (
+                        self._add_var_name(var_object.name) if var_object.can_expand else 0
+                    ),
                 },
             )
+            is_pointer = self._is_pointer_type(var_object.type, var_object.value)
+            if is_pointer and not self._is_null_pointer(var_object.value):
+                parsed_children.append(self._make_pointer_deref(var_object))
+        return parsed_children
 
-    def _has_children(self, responses: list[dict]) -> bool:
-        for resp in responses:
-            if not is_success_response(resp):
-                continue
+    def _make_pointer_deref(self, child: VarObject) -> dict:
+        """
+        Make a dereference entry for a non-null pointer child.
 
-            payload = resp.get("payload", {})
-            numchild = int(payload.get("numchild", "0"))
-            if numchild > 0:
-                return True
-        return False
+        GDB is not asked whether the pointee has children: the entry is always expandable,
+        and the variable object of the pointee is created only when the client expands it
+        (see `_create_deref_var_object`).
 
-    def _can_expand_variable(self, var_info: dict) -> bool:
-        return (
-            int(var_info.get("numchild", "0")) > 0
-            or var_info.get("has_more", "0") == "1"
-            or var_info.get("displayhint", "") == "array"
+        :param child: Pointer child from GDB.
+        :return: Dereference entry to show after the pointer.
+        """
+        deref_var_ref = self._add_var_name("")
+        self._deferred_derefs[deref_var_ref] = child.name
+        return {
+            "name": f"*({child.exp})",
+            "value": "",
+            "variablesReference": deref_var_ref,
+        }
+
+    def _create_deref_var_object(self, var_ref: int, pointer_var_name: str):
+        """
+        Create the variable object of a dereferenced pointer and assign it to `var_ref`.
+
+        :param var_ref: Reference of the dereference entry.
+        :param pointer_var_name: Name of the variable object of the pointer.
+        """
+        responses = self.backend.send_command_and_get_result(
+            f"-var-info-path-expression {escape_gdb_var_name(pointer_var_name)}",
         )
+        payload = self._parse_gdb_response(responses)
+        path_expr = payload.get("path_expr") if payload else None
+        if not path_expr:
+            return
 
-    def _is_complex_variable(self, value: str) -> bool:
-        return "{" in value or "[" in value
+        responses = self.backend.send_command_and_get_result(
+            f"-var-create - * {quote_gdb_expression(f'*({path_expr})')}",
+        )
+        payload = self._parse_gdb_response(responses)
+        deref_var_name = payload.get("name") if payload else None
+        if deref_var_name:
+            self._var_names[var_ref - VAR_REF_DYNAMIC_BASE] = deref_var_name
+            self._root_var_objects.append(deref_var_name)
+
+    def _is_expandable_value(self, value: str) -> bool:
+        """Check if a value has children: an aggregate or a non-null pointer."""
+        if "{" in value or "[" in value:
+            return True
+        value = value.strip()
+        return (
+            value.startswith("0x")
+            and value != "0x0"
+            and HEX_POINTER_PATTERN.fullmatch(value) is not None
+        )
 
     def _is_pointer_type(self, var_type: str, value: str) -> bool:
         if "*" in var_type.replace(" ", ""):
@@ -279,20 +412,26 @@ class VariableManager:
             return True
         return value.strip() in {"0x0", "NULL", "nullptr"}
 
-    def _is_pointer_value(self, value: str) -> bool:
-        return self._is_hex_pointer(value) and value.strip() != "0x0"
+    def _is_null_pointer(self, value: str) -> bool:
+        value = value.strip()
+        return value in {"0x0", "NULL", "nullptr"} or value.startswith("0x0 ")
 
     def _is_hex_pointer(self, value: str) -> bool:
-        return bool(re.fullmatch("0x[0-9a-fA-F]+", value.strip()))
+        value = value.strip()
+        return value.startswith("0x") and HEX_POINTER_PATTERN.fullmatch(value) is not None
 
-    def _extract_payload_field(self, responses: list[dict], field: str) -> list | None:
-        for resp in responses:
-            if is_success_response(resp):
-                return resp.get("payload", {}).get(field)
-        return None
+    def _extract_payload_field(self, responses: list[dict], field: str) -> list:
+        payload = self._parse_gdb_response(responses)
+        return (payload.get(field) if payload else None) or []
 
 
 def escape_gdb_var_name(name: str) -> str:
     """Escape special characters in a GDB variable name."""
     escaped = name.replace(",", r"\,").replace('"', r"\"")
     return f'"{escaped}"'
+
+
+def quote_gdb_expression(expression: str) -> str:
+    """Quote an expression as a single GDB/MI argument."""
+    escaped = expression.replace("\\", "\\\\").replace('"', r"\"")
+    return f'"{escaped}"'
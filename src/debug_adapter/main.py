@@ -1,11 +1,38 @@
 """Entry point for the Debug Adapter Protocol (DAP) server."""
 
 import argparse
+import logging
+import sys
+from logging.handlers import MemoryHandler
 
+from debug_adapter.common import LOG_LEVEL_TRACE
 from debug_adapter.dap.request_handler import DAPRequestHandler
 from debug_adapter.dap.server import DAPServer
 from debug_adapter.gdb.backend import GDBBackend
 
+LOG_BUFFER_CAPACITY = 256
+
+
+def _setup_logging(level: str):
+    """
+    Configure logging to stderr.
+
+    Records are buffered and written in batches, so debug logging does not add
+    a write to the terminal for every DAP message. Warnings flush the buffer immediately.
+    The TRACE level additionally logs the full content of DAP messages.
+    """
+    logging.addLevelName(LOG_LEVEL_TRACE, "TRACE")
+    stream_handler = logging.StreamHandler(sys.stderr)
+    stream_handler.setFormatter(
+        logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"),
+    )
+    buffered_handler = MemoryHandler(
+        capacity=LOG_BUFFER_CAPACITY,
+        flushLevel=logging.WARNING,
+        target=stream_handler,
+    )
+    logging.basicConfig(level=level, handlers=[buffered_handler])
+
 
 def _setup_components(gdb_path: str) -> tuple[GDBBackend, DAPRequestHandler, DAPServer]:
     """Initialize and return all required components."""
@@ -42,7 +69,15 @@ def main():
         default="/usr/bin/gdb",
         help="Path to the GDB executable",
     )
+    parser.add_argument(
+        "--log-level",
+        type=str.upper,
+        default="WARNING",
+        choices=["TRACE", "DEBUG", "INFO", "WARNING", "ERROR"],
+        help="Logging level of the adapter (logs are written to stderr)",
+    )
     args = parser.parse_args()
+    _setup_logging(args.log_level)
 
     print(f"Starting Debug Adapter with GDB Path: {args.gdb_path}", flush=True)
 
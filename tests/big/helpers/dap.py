@@ -70,8 +70,7 @@ def _extract_response_from_buffer(buffer: bytes) -> tuple[dict | None, bytes]:
     if header_end == -1:
         return None, buffer
 
-    headers = buffer[:header_end].decode(errors="replace")
-    content_length = _get_content_length(headers)
+    content_length = _get_content_length(buffer[:header_end])
     if content_length is None:
         pytest.fail("Missing Content-Length header")
 
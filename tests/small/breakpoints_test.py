@@ -2,12 +2,18 @@
 
 from unittest.mock import Mock
 
+import pytest
+
+from debug_adapter.gdb.backend import GDBBackend
 from debug_adapter.gdb.breakpoints import BreakpointManager
 
+LINE_TABLE_QUERIES = 2  # Before and after the line table cache is invalidated
+BREAKPOINT_INSERT_BATCHES = 2  # Before and after the breakpoint cache is invalidated
+
 
 def test_set_breakpoints(bp_manager: BreakpointManager, backend_mock: Mock):
     """Should correctly set multiple breakpoints in a given source file."""
-    backend_mock.send_command_and_get_result.side_effect = [
+    backend_mock.send_commands_and_get_results.return_value = [
         [{"type": "result", "message": "done"}],
         [{"type": "result", "message": "done"}],
     ]
@@ -31,6 +37,9 @@ def test_set_breakpoints(bp_manager: BreakpointManager, backend_mock: Mock):
             "message": "",
         },
     ]
+    backend_mock.send_commands_and_get_results.assert_called_once_with(
+        ["-break-insert main.cpp:10", "-break-insert main.cpp:20"],
+    )
 
 
 def test_clear_breakpoints(bp_manager: BreakpointManager, backend_mock):
@@ -50,12 +59,146 @@ def test_clear_breakpoints(bp_manager: BreakpointManager, backend_mock):
                 },
             },
         ],
-        [{"type": "result", "message": "done"}],  # -break-delete 1
-        [{"type": "result", "message": "done"}],  # -break-delete 2
+        [{"type": "result", "message": "done"}],  # -break-delete 1 2
     ]
 
     bp_manager.clear_breakpoints("main.cpp")
 
     backend_mock.send_command_and_get_result.assert_any_call("-break-list")
-    backend_mock.send_command_and_get_result.assert_any_call("-break-delete 1")
-    backend_mock.send_command_and_get_result.assert_any_call("-break-delete 2")
+    backend_mock.send_command_and_get_result.assert_any_call("-break-delete 1 2")
+
+
+def test_update_source_breakpoints_skips_unchanged(
+    bp_manager: BreakpointManager,
+    backend_mock: Mock,
+):
+    """Should not query GDB again when the breakpoints of a source did not change."""
+    backend_mock.send_command_and_get_result.return_value = [{"type": "result", "message": "done"}]
+    backend_mock.send_commands_and_get_results.return_value = [
+        [{"type": "result", "message": "done"}],  # -break-insert main.cpp:10
+    ]
+
+    first = bp_manager.update_source_breakpoints("main.cpp", [{"line": 10}])
+    second = bp_manager.update_source_breakpoints("main.cpp", [{"line": 10}])
+
+    assert second == first
+    backend_mock.send_command_and_get_result.assert_called_once_with("-break-list")
+    backend_mock.send_commands_and_get_results.assert_called_once()
+
+
+def test_update_source_breakpoints_resets_changed(
+    bp_manager: BreakpointManager,
+    backend_mock: Mock,
+):
+    """Should clear and set breakpoints again when the breakpoints of a source changed."""
+    backend_mock.send_command_and_get_result.return_value = [{"type": "result", "message": "done"}]
+    backend_mock.send_commands_and_get_results.return_value = [
+        [{"type": "result", "message": "done"}],  # -break-insert main.cpp:10
+    ]
+
+    bp_manager.update_source_breakpoints("main.cpp", [{"line": 10}])
+    backend_mock.send_command_and_get_result.reset_mock()
+    _, _, result = bp_manager.update_source_breakpoints("main.cpp", [])
+
+    assert result == []
+    backend_mock.send_command_and_get_result.assert_called_once_with("-break-list")
+
+
+def test_update_source_breakpoints_returns_copy(
+    bp_manager: BreakpointManager,
+    backend_mock: Mock,
+):
+    """Should not let callers change the cached result through the returned breakpoints."""
+    backend_mock.send_command_and_get_result.return_value = [{"type": "result", "message": "done"}]
+    backend_mock.send_commands_and_get_results.return_value = [
+        [{"type": "result", "message": "done"}],  # -break-insert main.cpp:10
+    ]
+
+    _, _, first = bp_manager.update_source_breakpoints("main.cpp", [{"line": 10}])
+    first[0]["verified"] = False
+    first[0]["source"]["path"] = "other.cpp"
+    _, _, second = bp_manager.update_source_breakpoints("main.cpp", [{"line": 10}])
+
+    assert second[0]["verified"] is True
+    assert second[0]["source"] == {"path": "main.cpp"}
+
+
+def test_update_source_breakpoints_column_changed(
+    bp_manager: BreakpointManager,
+    backend_mock: Mock,
+):
+    """Should set breakpoints again when only their column changed."""
+    backend_mock.send_command_and_get_result.return_value = [{"type": "result", "message": "done"}]
+    backend_mock.send_commands_and_get_results.return_value = [
+        [{"type": "result", "message": "done"}],  # -break-insert main.cpp:10
+    ]
+
+    bp_manager.update_source_breakpoints("main.cpp", [{"line": 10, "column": 1}])
+    bp_manager.update_source_breakpoints("main.cpp", [{"line": 10, "column": 5}])
+
+    assert backend_mock.send_commands_and_get_results.call_count == BREAKPOINT_INSERT_BATCHES
+
+
+@pytest.mark.parametrize(
+    "invalidate",
+    [
+        BreakpointManager.invalidate_breakpoint_cache,
+        BreakpointManager.set_exec_catchpoint,
+    ],
+)
+def test_update_source_breakpoints_after_invalidation(
+    bp_manager: BreakpointManager,
+    backend_mock: Mock,
+    invalidate,
+):
+    """Should set unchanged breakpoints again once the breakpoint cache was invalidated."""
+    backend_mock.send_command_and_get_result.return_value = [{"type": "result", "message": "done"}]
+    backend_mock.send_commands_and_get_results.return_value = [
+        [{"type": "result", "message": "done"}],  # -break-insert main.cpp:10
+    ]
+
+    bp_manager.update_source_breakpoints("main.cpp", [{"line": 10}])
+    invalidate(bp_manager)
+    bp_manager.update_source_breakpoints("main.cpp", [{"line": 10}])
+
+    assert backend_mock.send_commands_and_get_results.call_count == BREAKPOINT_INSERT_BATCHES
+
+
+@pytest.mark.parametrize("notification", ["breakpoint-deleted", "breakpoint-modified"])
+def test_breakpoint_notifications_invalidate_cache(notification: str):
+    """Should drop the breakpoint cache when GDB reports changed breakpoints."""
+    backend = GDBBackend("gdb")
+    backend.breakpoint_manager = Mock(spec=BreakpointManager)
+
+    backend._process_gdb_response(  # noqa: WPS437
+        {"type": "notify", "message": notification, "payload": {"id": "1"}},
+    )
+
+    backend.breakpoint_manager.invalidate_breakpoint_cache.assert_called_once_with()
+
+
+def test_breakpoint_locations_line_table_cached(
+    bp_manager: BreakpointManager,
+    backend_mock: Mock,
+):
+    """Should query the line table of a source once until it is invalidated."""
+    backend_mock.send_command_and_get_result.return_value = [
+        {
+            "type": "result",
+            "message": "done",
+            "payload": {"lines": [{"line": "10"}, {"line": "12"}, {"line": "12"}]},
+        },
+    ]
+
+    first = bp_manager.get_breakpoint_locations("main.cpp", 10, 12)
+    second = bp_manager.get_breakpoint_locations("main.cpp", 12)
+    backend_mock.send_command_and_get_result.assert_called_once_with(
+        "-symbol-list-lines main.cpp",
+    )
+
+    bp_manager.invalidate_line_cache()
+    bp_manager.get_breakpoint_locations("main.cpp", 10)
+
+    assert first == (True, "", [{"line": 10}, {"line": 12}])
+    assert second == (True, "", [{"line": 12}])
+    assert backend_mock.send_command_and_get_result.call_count == LINE_TABLE_QUERIES
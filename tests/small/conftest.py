@@ -6,6 +6,9 @@ import pytest
 
 from debug_adapter.gdb.backend import GDBBackend
 from debug_adapter.gdb.breakpoints import BreakpointManager
+from debug_adapter.gdb.execution_manager import ExecutionManager
+from debug_adapter.gdb.processes import ProcessManager
+from debug_adapter.gdb.threads import ThreadManager
 from debug_adapter.gdb.variables import VariableManager
 
 
@@ -25,3 +28,21 @@ def variable_manager(backend_mock: GDBBackend):  # noqa: WPS442
 def bp_manager(backend_mock: Mock):  # noqa: WPS442
     """Provide a BreakpointManager instance using a mocked backend."""
     return BreakpointManager(backend=backend_mock)
+
+
+@pytest.fixture
+def execution_manager(backend_mock: Mock):  # noqa: WPS442
+    """Provide an ExecutionManager instance using a mocked backend."""
+    return ExecutionManager(backend=backend_mock)
+
+
+@pytest.fixture
+def process_manager(backend_mock: Mock):  # noqa: WPS442
+    """Provide a ProcessManager instance using a mocked backend."""
+    return ProcessManager(backend=backend_mock)
+
+
+@pytest.fixture
+def thread_manager(backend_mock: Mock):  # noqa: WPS442
+    """Provide a ThreadManager instance using a mocked backend."""
+    return ThreadManager(backend=backend_mock)
@@ -0,0 +1,43 @@
+"""Unit tests for ExecutionManager in GDB adapter."""
+
+from unittest.mock import Mock, call
+
+from debug_adapter.common import CommandResult
+from debug_adapter.gdb.execution_manager import ExecutionManager
+
+
+def test_step_out_sets_scheduler_locking_once(
+    execution_manager: ExecutionManager,
+    backend_mock: Mock,
+):
+    """Should only send `set scheduler-locking` when the mode changes."""
+    backend_mock.send_command_and_check_for_success.return_value = CommandResult(True, "")
+
+    execution_manager.execute_step_out(None, single_thread=True)
+    execution_manager.execute_step_out(None, single_thread=True)
+    execution_manager.execute_step_out(None, single_thread=False)
+
+    assert backend_mock.send_command_and_get_result.call_args_list == [
+        call("set scheduler-locking on"),
+        call("set scheduler-locking off"),
+    ]
+
+
+def test_step_commands_select_thread_inline(
+    execution_manager: ExecutionManager,
+    backend_mock: Mock,
+):
+    """Should pass the thread with `--thread` instead of a separate `-thread-select`."""
+    backend_mock.send_command_and_check_for_success.return_value = CommandResult(True, "")
+
+    execution_manager.execute_next(3)
+    execution_manager.execute_step_in(3)
+    execution_manager.execute_step_out(3, single_thread=False)
+    execution_manager.execute_next(None)
+
+    assert backend_mock.send_command_and_check_for_success.call_args_list == [
+        call("-exec-next --thread 3"),
+        call("-exec-step --thread 3"),
+        call("-exec-finish --thread 3"),
+        call("-exec-next"),
+    ]
@@ -0,0 +1,110 @@
+"""Unit tests for ProcessManager in GDB adapter."""
+
+from unittest.mock import Mock
+
+from debug_adapter.gdb.processes import ProcessManager
+
+APP_PID = 42
+
+THREAD_GROUPS_RESPONSE = [
+    {
+        "type": "result",
+        "message": "done",
+        "payload": {"groups": [{"id": "i1", "type": "process", "pid": "42"}]},
+    },
+]
+
+
+def test_thread_groups_cached_while_state_unchanged(
+    process_manager: ProcessManager,
+    backend_mock: Mock,
+):
+    """Should query the inferiors once as long as the GDB state does not change."""
+    backend_mock.state_version = 1
+    backend_mock.send_command_and_get_result.return_value = THREAD_GROUPS_RESPONSE
+
+    first = process_manager.get_inferiors_list()
+    second = process_manager.get_inferiors_list()
+
+    assert first == second == [{"id": "i1", "type": "process", "pid": "42"}]
+    backend_mock.send_command_and_get_result.assert_called_once_with("-list-thread-groups")
+
+
+def test_thread_groups_requeried_after_state_change(
+    process_manager: ProcessManager,
+    backend_mock: Mock,
+):
+    """Should query the inferiors again once the GDB state version changes."""
+    backend_mock.state_version = 1
+    backend_mock.send_command_and_get_result.return_value = THREAD_GROUPS_RESPONSE
+    process_manager.get_inferiors_list()
+
+    backend_mock.state_version = 2
+    backend_mock.send_command_and_get_result.return_value = [
+        {"type": "result", "message": "done", "payload": {"groups": []}},
+    ]
+
+    assert process_manager.get_inferiors_list() == []
+
+
+def test_prepare_new_process_sends_one_batch(
+    process_manager: ProcessManager,
+    backend_mock: Mock,
+):
+    """Should pipeline the breakpoint, process list and thread info commands."""
+    done = {"type": "result", "message": "done"}
+    backend_mock.send_commands_and_get_results.return_value = [
+        [done],  # -break-insert main
+        [  # -info-os processes
+            {
+                "type": "result",
+                "message": "done",
+                "payload": {"OSDataTable": {"body": [{"col0": "42", "col1": "app"}]}},
+            },
+        ],
+        [  # -thread-info
+            {
+                "type": "result",
+                "message": "done",
+                "payload": {
+                    "current-thread-id": "1",
+                    "threads": [{"id": "1", "target-id": "Thread 42.42"}],
+                },
+            },
+        ],
+    ]
+
+    result, processes, current_pid = process_manager.prepare_new_process("")
+
+    assert result.success is True
+    assert processes == [{"pid": APP_PID, "name": "app"}]
+    assert current_pid == APP_PID
+    backend_mock.send_commands_and_get_results.assert_called_once_with(
+        ["-break-insert main", "-info-os processes", "-thread-info"],
+    )
+    backend_mock.send_command_and_get_result.assert_not_called()
+
+
+def test_prepare_new_process_skips_stray_records(
+    process_manager: ProcessManager,
+    backend_mock: Mock,
+):
+    """Should find the process list after records without a token attributed to the command."""
+    done = {"type": "result", "message": "done"}
+    backend_mock.send_commands_and_get_results.return_value = [
+        [done],  # -break-insert main
+        [  # -info-os processes
+            {"type": "console", "message": None, "payload": "Reading symbols...\n"},
+            {
+                "type": "result",
+                "message": "done",
+                "payload": {"OSDataTable": {"body": [{"col0": "42", "col1": "app"}]}},
+            },
+        ],
+        [done],  # -thread-info
+    ]
+
+    result, processes, _ = process_manager.prepare_new_process("")
+
+    assert result.success is True
+    assert processes == [{"pid": APP_PID, "name": "app"}]
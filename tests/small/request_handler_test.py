@@ -0,0 +1,50 @@
+"""Unit tests for the DAP request handler."""
+
+from unittest.mock import Mock
+
+from debug_adapter.common import CommandResult
+from debug_adapter.dap.request_handler import DAPRequestHandler
+from debug_adapter.gdb.execution_manager import ExecutionManager
+
+
+def test_setup_commands_stop_at_first_failure(backend_mock: Mock):
+    """Should send setup commands in batches and not run the ones after a failed command."""
+    backend_mock.execution_manager = Mock(spec=ExecutionManager)
+    backend_mock.send_commands_and_check_for_success.side_effect = [
+        [CommandResult(success=True, message=""), CommandResult(success=True, message="")],
+        [CommandResult(success=False, message="No symbol table")],
+    ]
+    request = {
+        "arguments": {
+            "setupCommands": [
+                {"text": "set pagination off", "ignoreFailures": True},
+                {"text": "set print pretty on"},
+                {"text": "source missing.gdb"},
+                {"text": "set scheduler-locking step"},
+            ],
+        },
+    }
+
+    result = DAPRequestHandler(backend_mock)._set_custom_settings(request)  # noqa: WPS437
+
+    assert result == CommandResult(success=False, message="No symbol table")
+    batches = [
+        call.args[0] for call in backend_mock.send_commands_and_check_for_success.call_args_list
+    ]
+    assert batches == [
+        [("set pagination off", True), ("set print pretty on", False)],
+        [("source missing.gdb", False)],
+    ]
+    backend_mock.execution_manager.forget_scheduler_locking.assert_called_once_with()
+
+
+def test_evaluate_forgets_scheduler_locking(backend_mock: Mock):
+    """Should make the next step-out set `scheduler-locking` again after a raw command."""
+    backend_mock.execution_manager = Mock(spec=ExecutionManager)
+    backend_mock.send_command_and_get_result.return_value = []
+    request = {"seq": 1, "arguments": {"expression": "set scheduler-locking on"}}
+
+    DAPRequestHandler(backend_mock)._evaluate(request)  # noqa: WPS437
+
+    backend_mock.send_command_and_get_result.assert_called_once_with("set scheduler-locking on")
+    backend_mock.execution_manager.forget_scheduler_locking.assert_called_once_with()
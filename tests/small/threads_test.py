@@ -0,0 +1,46 @@
+"""Unit tests for ThreadManager in GDB adapter."""
+
+from unittest.mock import Mock
+
+from debug_adapter.gdb.threads import ThreadManager
+
+
+def test_get_threads_fills_missing_fields(thread_manager: ThreadManager, backend_mock: Mock):
+    """Should return the threads of `-thread-info`, naming missing fields after the thread."""
+    backend_mock.send_command_and_get_result.return_value = [
+        {
+            "type": "result",
+            "message": "done",
+            "payload": {
+                "threads": [
+                    {"id": "1", "target-id": "Thread 0x7f (LWP 42)", "name": "app"},
+                    {"id": "2", "state": "stopped"},
+                ],
+            },
+        },
+    ]
+
+    success, message, threads = thread_manager.get_threads()
+
+    assert success is True
+    assert message == ""
+    assert threads == [
+        {
+            "id": 1,
+            "target-id": "Thread 0x7f (LWP 42)",
+            "name": "app",
+            "frame": "Thread 1",
+            "details": "Thread 1",
+            "state": "Thread 1",
+            "core": "Thread 1",
+        },
+        {
+            "id": 2,
+            "target-id": "Thread 2",
+            "name": "Thread 2",
+            "frame": "Thread 2",
+            "details": "Thread 2",
+            "state": "stopped",
+            "core": "Thread 2",
+        },
+    ]
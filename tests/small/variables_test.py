@@ -1,7 +1,12 @@
 """Unit tests for the GDB variable handling module."""
 
+import itertools
+import threading
+
 from debug_adapter.common import VAR_REF_DYNAMIC_BASE
-from debug_adapter.gdb.variables import VariableManager, escape_gdb_var_name
+from debug_adapter.gdb.variables import VariableManager, VarObject, escape_gdb_var_name
+
+LOCALS_QUERIES = 2  # Before and after the GDB state changes
 
 
 def test_is_hex_pointer_true(variable_manager: VariableManager):
@@ -40,6 +45,16 @@ def test_escape_gdb_var_name():
     assert result == r'"a\,\"b\"\,c"'
 
 
+def test_var_object_from_record():
+    """Should convert the fields of a GDB/MI record once, with defaults for missing fields."""
+    var_object = VarObject.from_record({"name": "var1", "numchild": "0", "has_more": "1"})
+
+    assert var_object.numchild == 0
+    assert var_object.has_more is True
+    assert var_object.value == "<unknown>"
+    assert var_object.can_expand is True
+
+
 def test_local_var_refs_for_complex_and_ptrs(
     variable_manager: VariableManager,
     monkeypatch,
@@ -47,8 +62,11 @@ def test_local_var_refs_for_complex_and_ptrs(
     """Should create variable references for complex and pointer types."""
     monkeypatch.setattr(
         variable_manager,
-        "create_gdb_variable",
-        lambda name: {"variablesReference": VAR_REF_DYNAMIC_BASE},
+        "create_gdb_variables",
+        lambda names: [
+            {"gdb_name": f"var_{name}", "variablesReference": VAR_REF_DYNAMIC_BASE}
+            for name in names
+        ],
     )
 
     monkeypatch.setattr(
@@ -69,32 +87,38 @@ def test_local_var_refs_for_complex_and_ptrs(
     ]
 
 
-def test_create_gdb_variable(variable_manager: VariableManager, backend_mock):
-    """Should create a GDB variable and return its metadata."""
-    backend_mock.send_command_and_get_result.return_value = [
-        {
-            "type": "result",
-            "message": "done",
-            "payload": {
-                "name": "var_123",
-                "value": "{a = 1}",
-                "type": "MyStruct",
-                "numchild": "1",
+def test_create_gdb_variables(variable_manager: VariableManager, backend_mock):
+    """Should create GDB variables with one batch and return their metadata in order."""
+    backend_mock.send_commands_and_get_results.return_value = [
+        [
+            {
+                "type": "result",
+                "message": "done",
+                "payload": {
+                    "name": "var_123",
+                    "value": "{a = 1}",
+                    "type": "MyStruct",
+                    "numchild": "1",
+                },
             },
-        },
+        ],
+        [{"type": "result", "message": "error", "payload": {"msg": "No symbol"}}],
     ]
 
-    result = variable_manager.create_gdb_variable("myvar")
+    result, missing = variable_manager.create_gdb_variables(["myvar", "nosuchvar"])
+    backend_mock.send_commands_and_get_results.assert_called_once_with(
+        ["-var-create - * myvar", "-var-create - * nosuchvar"],
+    )
     assert result["name"] == "myvar"
     assert result["value"] == "{a = 1}"
     assert result["type"] == "MyStruct"
     assert result["variablesReference"] == VAR_REF_DYNAMIC_BASE
+    assert missing == {}
 
 
 def test_get_variable_children(variable_manager: VariableManager, backend_mock):
     """Should retrieve child variables for a given variable reference."""
-    var_ref = VAR_REF_DYNAMIC_BASE
-    variable_manager._var_map[var_ref] = "some_var"  # noqa: WPS437
+    var_ref = variable_manager._add_var_name("some_var")  # noqa: WPS437
 
     backend_mock.send_command_and_get_result.return_value = [
         {
@@ -118,25 +142,207 @@ def test_get_variable_children(variable_manager: VariableManager, backend_mock):
     assert children == [
         {"name": "child1", "value": "42", "variablesReference": 0},
     ]
+    backend_mock.send_command_and_get_result.assert_called_once_with(
+        '-var-list-children --simple-values "some_var"',
+    )
 
 
 def test_adds_deref_for_pointer_var(variable_manager: VariableManager, backend_mock):
-    """Should add a dereference entry when processing a pointer variable."""
-    var_ref = VAR_REF_DYNAMIC_BASE + 1
-    variable_manager._var_map[var_ref] = "ptr"  # noqa: WPS437
+    """Should add a dereference entry whose variable object is created when it is expanded."""
+    var_ref = variable_manager._add_var_name("some_var")  # noqa: WPS437
+    backend_mock.send_command_and_get_result.side_effect = [
+        [
+            {
+                "type": "result",
+                "message": "done",
+                "payload": {
+                    "children": [
+                        {
+                            "name": "some_var.ptr",
+                            "exp": "ptr",
+                            "value": "0x1234",
+                            "type": "int *",
+                            "numchild": "1",
+                        },
+                        {
+                            "name": "some_var.null",
+                            "exp": "null",
+                            "value": "0x0",
+                            "type": "int *",
+                            "numchild": "1",
+                        },
+                    ],
+                },
+            },
+        ],
+        [{"type": "result", "message": "done", "payload": {"path_expr": "(s).ptr"}}],
+        [{"type": "result", "message": "done", "payload": {"name": "var2", "numchild": "0"}}],
+        [{"type": "result", "message": "done", "payload": {"numchild": "0"}}],
+    ]
+
+    children = variable_manager.get_variable_children(var_ref)
+    assert [child["name"] for child in children] == ["ptr", "*(ptr)", "null"]
+    assert backend_mock.send_command_and_get_result.call_count == 1
+
+    variable_manager.get_variable_children(children[1]["variablesReference"])
+    commands = [call.args[0] for call in backend_mock.send_command_and_get_result.call_args_list]
+    assert commands[1:] == [
+        '-var-info-path-expression "some_var.ptr"',
+        '-var-create - * "*((s).ptr)"',
+        '-var-list-children --simple-values "var2"',
+    ]
+
+
+def test_get_variable_children_unknown_ref(variable_manager: VariableManager, backend_mock):
+    """Should return no children for a reference that was never assigned."""
+    variable_manager._add_var_name("some_var")  # noqa: WPS437
+
+    assert variable_manager.get_variable_children(VAR_REF_DYNAMIC_BASE + 1) == []
+    backend_mock.send_command_and_get_result.assert_not_called()
+
+
+def test_local_var_objects_reused_until_invalidated(
+    variable_manager: VariableManager,
+    backend_mock,
+):
+    """Should create variable objects of a frame once until the cache is invalidated."""
+    backend_mock.send_command_and_get_result.return_value = [
+        {
+            "type": "result",
+            "message": "done",
+            "payload": {"variables": [{"name": "s", "value": "{a = 1}"}]},
+        },
+    ]
+    backend_mock.send_commands_and_get_results.return_value = [
+        [
+            {
+                "type": "result",
+                "message": "done",
+                "payload": {"name": "var1", "value": "{...}", "numchild": "1"},
+            },
+        ],
+    ]
+
+    first = variable_manager._get_local_vars()  # noqa: WPS437
+    second = variable_manager._get_local_vars()  # noqa: WPS437
+    backend_mock.send_commands_and_get_results.assert_called_once_with(["-var-create - * s"])
+
+    variable_manager.invalidate_variable_cache()
+    third = variable_manager._get_local_vars()  # noqa: WPS437
+
+    assert first == second == third
+    assert first[0]["variablesReference"] == VAR_REF_DYNAMIC_BASE
+    batches = [call.args[0] for call in backend_mock.send_commands_and_get_results.call_args_list]
+    assert batches == [["-var-create - * s"], ["-var-delete var1"], ["-var-create - * s"]]
+
+
+def test_non_expandable_local_var_object_deleted_after_stop(
+    variable_manager: VariableManager,
+    backend_mock,
+):
+    """Should delete a local variable object without children once the program stops again."""
     backend_mock.send_command_and_get_result.return_value = [
-        {"type": "result", "message": "done", "payload": {"numchild": "1"}},
+        {
+            "type": "result",
+            "message": "done",
+            "payload": {"variables": [{"name": "p", "value": "0x1234"}]},
+        },
     ]
+    backend_mock.send_commands_and_get_results.return_value = [
+        [
+            {
+                "type": "result",
+                "message": "done",
+                "payload": {"name": "var1", "value": "0x1234", "type": "void *", "numchild": "0"},
+            },
+        ],
+    ]
+    assert variable_manager._get_local_vars()[0]["variablesReference"] == 0  # noqa: WPS437
+
+    variable_manager.invalidate_variable_cache()
+    variable_manager._get_local_vars()  # noqa: WPS437
+
+    backend_mock.send_commands_and_get_results.assert_any_call(["-var-delete var1"])
+
+
+def test_thread_switch_keeps_variable_references(
+    variable_manager: VariableManager,
+    backend_mock,
+):
+    """Should keep references valid while stopped when the locals of another thread are listed."""
+    var_ref = variable_manager._add_var_name("var1")  # noqa: WPS437
+
+    variable_manager.forget_local_variables()
+
+    assert variable_manager._get_var_name(var_ref) == "var1"  # noqa: WPS437
+    variable_manager.invalidate_variable_cache()
+    assert variable_manager.get_variable_children(var_ref) == []
+    backend_mock.send_command_and_get_result.assert_not_called()
+
+
+def test_local_variables_query_shared_until_state_changes(
+    variable_manager: VariableManager,
+    backend_mock,
+):
+    """Should reuse the locals fetched for `scopes` until the GDB state version changes."""
+    backend_mock.state_version = 1
+    backend_mock.send_command_and_get_result.return_value = [
+        {
+            "type": "result",
+            "message": "done",
+            "payload": {"variables": [{"name": "i", "value": "42"}]},
+        },
+    ]
+
+    assert variable_manager.check_for_local_variables()
+    variable_manager._get_local_vars()  # noqa: WPS437
+    backend_mock.send_command_and_get_result.assert_called_once_with(
+        "-stack-list-variables --all-values",
+    )
+
+    backend_mock.state_version = 2
+    variable_manager._get_local_vars()  # noqa: WPS437
+    assert backend_mock.send_command_and_get_result.call_count == LOCALS_QUERIES
+
+
+def test_stop_during_query_applied_by_next_query(
+    variable_manager: VariableManager,
+    backend_mock,
+):
+    """Should delete a variable object created while the event thread reported a stop."""
+    backend_mock.send_command_and_get_result.return_value = [
+        {
+            "type": "result",
+            "message": "done",
+            "payload": {"variables": [{"name": "s", "value": "{a = 1}"}]},
+        },
+    ]
+    var_numbers = itertools.count(1)
+    stop_reported = threading.Event()
+
+    def send_commands(commands: list[str]) -> list[list[dict]]:
+        if not stop_reported.is_set():
+            # The program stops while GDB creates the first variable object
+            stop_reported.set()
+            event_thread = threading.Thread(target=variable_manager.invalidate_variable_cache)
+            event_thread.start()
+            event_thread.join()
+        return [
+            [
+                {
+                    "type": "result",
+                    "message": "done",
+                    "payload": {"name": f"var{next(var_numbers)}", "numchild": "1"},
+                },
+            ]
+            for _ in commands
+        ]
+
+    backend_mock.send_commands_and_get_results.side_effect = send_commands
+
+    first = variable_manager._get_local_vars()  # noqa: WPS437
+    assert variable_manager._get_var_name(first[0]["variablesReference"]) == "var1"  # noqa: WPS437
+    variable_manager._get_local_vars()  # noqa: WPS437
 
-    entries: list = []
-    child = {
-        "name": "ptr",
-        "exp": "ptr",
-        "value": "0x1234",
-        "type": "int*",
-        "numchild": "0",  # as if the variable has not yet been dereferenced
-    }
-
-    variable_manager._process_pointer_variable(entries, child, "ptr")  # noqa: WPS437
-    # the entries list must contain at least one element whose name contains *(
-    assert any("*(" in entry["name"] for entry in entries)
+    batches = [call.args[0] for call in backend_mock.send_commands_and_get_results.call_args_list]
+    assert batches == [["-var-create - * s"], ["-var-delete var1"], ["-var-create - * s"]]